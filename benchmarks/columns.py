@@ -0,0 +1,77 @@
+"""Benchmark for exporting stop times as columns, compared with iterating over
+every journey's get_times().
+
+    python -m benchmarks.columns [path/to/file.xml] [--journeys 200 ...]
+
+Without a path, it uses a document made by benchmarks.generate.
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import time
+
+from txc import columns, txc
+
+from . import generate
+
+
+def get_best_time(function, repeat=3) -> float:
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def get_times(document):
+    for journey in document.journeys:
+        for _ in journey.get_times():
+            pass
+
+
+def measure(path) -> dict:
+    document = txc.TransXChange(path)
+
+    # compile each JourneyPattern's template first, as it's only done once
+    get_times(document)
+
+    rows = len(columns.get_stop_time_columns(document))
+    get_times_time = get_best_time(lambda: get_times(document))
+    columns_time = get_best_time(lambda: columns.get_stop_time_columns(document))
+    return {
+        "journeys": len(document.journeys),
+        "rows": rows,
+        "get_times (s)": get_times_time,
+        "get_stop_time_columns (s)": columns_time,
+        "speedup": get_times_time / columns_time,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("path", nargs="?", help="instead of generating a document")
+    generate.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.path:
+        results = measure(args.path)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "generated.xml")
+            with open(path, "w") as open_file:
+                generate.generate(open_file, **generate.get_kwargs(args))
+            results = measure(path)
+
+    for key, value in results.items():
+        if isinstance(value, float):
+            print(f"{key:<28} {value:>12.3f}")
+        else:
+            print(f"{key:<28} {value:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Generate a synthetic TransXChange document, for benchmarking.
+
+    python -m benchmarks.generate out.xml [--services 20] [--patterns 4] ...
+
+The same arguments (including the seed) always produce the same document.
+It has services * patterns * journeys VehicleJourneys, each calling at `stops`
+stops, with a mix of the things that take the slow paths through the parser:
+operating profiles with serviced organisations and bank holidays,
+VehicleJourneyTimingLinks, dead runs and VehicleJourneyRefs.
+"""
+
+import argparse
+import random
+
+HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<TransXChange xmlns="http://www.transxchange.org.uk/" '
+    'ModificationDateTime="2025-01-01T00:00:00" RevisionNumber="1" '
+    'FileName="generated.xml">\n'
+)
+
+SCHOOL_PROFILE = (
+    "<OperatingProfile><RegularDayType><DaysOfWeek><MondayToFriday/></DaysOfWeek>"
+    "</RegularDayType><ServicedOrganisationDayType><DaysOfOperation><WorkingDays>"
+    "<ServicedOrganisationRef>SO{}</ServicedOrganisationRef></WorkingDays>"
+    "</DaysOfOperation></ServicedOrganisationDayType></OperatingProfile>"
+)
+SATURDAY_PROFILE = (
+    "<OperatingProfile><RegularDayType><DaysOfWeek><Saturday/></DaysOfWeek>"
+    "</RegularDayType><BankHolidayOperation><DaysOfNonOperation><ChristmasDay/>"
+    "</DaysOfNonOperation></BankHolidayOperation></OperatingProfile>"
+)
+
+
+def generate(open_file, services=20, patterns=4, journeys=200, stops=30, seed=1):
+    """Write a document to a file opened in text mode"""
+    rng = random.Random(seed)
+    write = open_file.write
+    write(HEADER)
+
+    write("<ServicedOrganisations>")
+    for i in range(10):
+        write(
+            f"<ServicedOrganisation><OrganisationCode>SO{i}</OrganisationCode>"
+            f"<Name>School {i}</Name><WorkingDays><DateRange>"
+            "<StartDate>2025-09-01</StartDate><EndDate>2025-10-24</EndDate>"
+            "</DateRange></WorkingDays><Holidays><DateRange>"
+            "<StartDate>2025-10-27</StartDate><EndDate>2025-10-31</EndDate>"
+            "</DateRange></Holidays></ServicedOrganisation>"
+        )
+    write("</ServicedOrganisations>\n")
+
+    # three times as many stops as each journey pattern calls at, in a line
+    stop_count = stops * 3
+    write("<StopPoints>")
+    for i in range(stop_count):
+        write(
+            f"<AnnotatedStopPointRef><StopPointRef>S{i:05}</StopPointRef>"
+            f"<CommonName>Stop {i}</CommonName><LocalityName>Town</LocalityName>"
+            "</AnnotatedStopPointRef>"
+        )
+    write("</StopPoints>\n")
+
+    write("<RouteSections>")
+    for i in range(stop_count - 1):
+        write(
+            f'<RouteSection id="RS{i}"><RouteLink id="RL{i}">'
+            f"<From><StopPointRef>S{i:05}</StopPointRef></From>"
+            f"<To><StopPointRef>S{i + 1:05}</StopPointRef></To><Track><Mapping>"
+        )
+        for j in range(5):
+            write(
+                f"<Location><Longitude>{0.9 + i * 0.001 + j * 0.0002:.5f}</Longitude>"
+                f"<Latitude>{51.8 + i * 0.001:.5f}</Latitude></Location>"
+            )
+        write("</Mapping></Track></RouteLink></RouteSection>")
+    write("</RouteSections>\n")
+
+    write('<Routes><Route id="R0">')
+    for i in range(stop_count - 1):
+        write(f"<RouteSectionRef>RS{i}</RouteSectionRef>")
+    write("</Route></Routes>\n")
+
+    write("<JourneyPatternSections>")
+    for service in range(services):
+        for pattern in range(patterns):
+            start = rng.randrange(0, stop_count - stops)
+            write(f'<JourneyPatternSection id="JPS{service}_{pattern}">')
+            for i in range(stops - 1):
+                origin = start + i
+                from_activity = "<Activity>pickUp</Activity>" if i == 0 else ""
+                to_activity = "<Activity>setDown</Activity>" if i == stops - 2 else ""
+                wait_time = "<WaitTime>PT1M</WaitTime>" if i % 7 == 3 else ""
+                write(
+                    f'<JourneyPatternTimingLink id="JPTL{service}_{pattern}_{i}">'
+                    f'<From SequenceNumber="{i + 1}">{from_activity}'
+                    f"<StopPointRef>S{origin:05}</StopPointRef>"
+                    "<TimingStatus>otherPoint</TimingStatus></From>"
+                    f'<To SequenceNumber="{i + 2}">{to_activity}'
+                    f"<StopPointRef>S{origin + 1:05}</StopPointRef>"
+                    f"<TimingStatus>otherPoint</TimingStatus>{wait_time}</To>"
+                    f"<RouteLinkRef>RL{origin}</RouteLinkRef>"
+                    f"<RunTime>PT{rng.randrange(1, 6)}M</RunTime>"
+                    "</JourneyPatternTimingLink>"
+                )
+            write("</JourneyPatternSection>")
+    write("</JourneyPatternSections>\n")
+
+    write(
+        '<Operators><Operator id="O1"><NationalOperatorCode>GEN</NationalOperatorCode>'
+        "<OperatorShortName>Generated</OperatorShortName></Operator></Operators>\n"
+    )
+
+    write("<Services>")
+    for service in range(services):
+        write(
+            f"<Service><ServiceCode>SV{service}</ServiceCode><Lines>"
+            f'<Line id="L{service}_0"><LineName>{service}</LineName></Line>'
+            f'<Line id="L{service}_1"><LineName>{service}A</LineName></Line>'
+            "</Lines><OperatingPeriod><StartDate>2025-01-01</StartDate>"
+            "<EndDate>2025-12-31</EndDate></OperatingPeriod><OperatingProfile>"
+            "<RegularDayType><DaysOfWeek><MondayToFriday/></DaysOfWeek>"
+            "</RegularDayType></OperatingProfile>"
+            "<RegisteredOperatorRef>O1</RegisteredOperatorRef><StandardService>"
+            "<Origin>A</Origin><Destination>B</Destination>"
+        )
+        for pattern in range(patterns):
+            write(
+                f'<JourneyPattern id="JP{service}_{pattern}">'
+                "<Direction>outbound</Direction><RouteRef>R0</RouteRef>"
+                "<JourneyPatternSectionRefs>"
+                f"JPS{service}_{pattern}</JourneyPatternSectionRefs></JourneyPattern>"
+            )
+        write("</StandardService></Service>")
+    write("</Services>\n")
+
+    write("<VehicleJourneys>")
+    code = 0
+    for service in range(services):
+        for pattern in range(patterns):
+            for i in range(journeys):
+                code += 1
+                if i % 10 == 0:
+                    write(f"<VehicleJourney>{SCHOOL_PROFILE.format(i // 10 % 10)}")
+                elif i % 10 == 1:
+                    write(f"<VehicleJourney>{SATURDAY_PROFILE}")
+                else:
+                    write("<VehicleJourney>")
+                write(
+                    f"<OperatorRef>O1</OperatorRef>"
+                    f"<VehicleJourneyCode>VJ{code}</VehicleJourneyCode>"
+                    f"<ServiceRef>SV{service}</ServiceRef>"
+                    f"<LineRef>L{service}_{i % 2}</LineRef>"
+                )
+                if i % 50 == 7:
+                    write(f"<VehicleJourneyRef>VJ{code - 1}</VehicleJourneyRef>")
+                else:
+                    write(
+                        f"<JourneyPatternRef>JP{service}_{pattern}</JourneyPatternRef>"
+                    )
+                departure_time = 5 * 3600 + i * 300
+                write(
+                    f"<DepartureTime>{departure_time // 3600:02}:"
+                    f"{departure_time // 60 % 60:02}:00</DepartureTime>"
+                )
+                if i % 25 == 5:
+                    write(
+                        "<VehicleJourneyTimingLink><JourneyPatternTimingLinkRef>"
+                        f"JPTL{service}_{pattern}_2</JourneyPatternTimingLinkRef>"
+                        "<RunTime>PT7M</RunTime></VehicleJourneyTimingLink>"
+                    )
+                elif i % 25 == 6:
+                    write(
+                        "<StartDeadRun><ShortWorking><JourneyPatternTimingLinkRef>"
+                        f"JPTL{service}_{pattern}_3</JourneyPatternTimingLinkRef>"
+                        "</ShortWorking></StartDeadRun>"
+                    )
+                write("</VehicleJourney>")
+    write("</VehicleJourneys>\n</TransXChange>\n")
+
+
+def add_arguments(parser):
+    parser.add_argument("--services", type=int, default=20)
+    parser.add_argument("--patterns", type=int, default=4, help="per service")
+    parser.add_argument("--journeys", type=int, default=200, help="per pattern")
+    parser.add_argument("--stops", type=int, default=30, help="per pattern")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def get_kwargs(args) -> dict:
+    return {
+        "services": args.services,
+        "patterns": args.patterns,
+        "journeys": args.journeys,
+        "stops": args.stops,
+        "seed": args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("path")
+    add_arguments(parser)
+    args = parser.parse_args()
+    with open(args.path, "w") as open_file:
+        generate(open_file, **get_kwargs(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Memory benchmark: how many bytes each parsed journey and timing link takes.
+
+    python -m benchmarks.memory [path/to/file.xml] [--journeys 200 ...]
+
+Without a path, it uses a document made by benchmarks.generate (the same one
+each time, for the same arguments). Run it before and after a change to
+compare.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from txc import txc
+
+from . import generate
+
+
+def get_size(obj) -> int:
+    """The size of an object, including its __dict__ if it has one"""
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def measure(path) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    document = txc.TransXChange(path)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    journeys = document.journeys
+    timinglinks = {
+        id(timinglink): timinglink
+        for service in document.services.values()
+        for journey_pattern in service.journey_patterns.values()
+        for timinglink in journey_pattern.get_timinglinks()
+    }.values()
+    cells = [cell for journey in journeys[:100] for cell in journey.get_times()]
+
+    return {
+        "journeys": len(journeys),
+        "timing links": len(timinglinks),
+        "retained bytes": retained,
+        "peak bytes": peak,
+        "retained bytes per journey": retained // max(len(journeys), 1),
+        "bytes per journey": sum(
+            get_size(journey) + sum(get_size(link) for link in journey.timing_links)
+            for journey in journeys
+        )
+        // max(len(journeys), 1),
+        "bytes per timing link": sum(
+            get_size(link) + get_size(link.origin) + get_size(link.destination)
+            for link in timinglinks
+        )
+        // max(len(timinglinks), 1),
+        "bytes per cell": sum(get_size(cell) for cell in cells) // max(len(cells), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("path", nargs="?", help="instead of generating a document")
+    generate.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.path:
+        results = measure(args.path)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "generated.xml")
+            with open(path, "w") as open_file:
+                generate.generate(open_file, **generate.get_kwargs(args))
+            results = measure(path)
+
+    for key, value in results.items():
+        print(f"{key:<28} {value:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Micro-benchmark for the time and duration parsers.
+
+python -m benchmarks.parsers
+"""
+
+import timeit
+
+from txc import txc
+
+# a realistic mix: a few distinct durations, lots of departure times
+DURATIONS = ["PT1M", "PT2M", "PT3M", "PT5M", "PT1H30M", "PT45S", "-PT2M", "PT0S"]
+TIMES = [f"{hour:02}:{minute:02}:00" for hour in range(5, 24) for minute in range(60)]
+
+FUNCTIONS = (
+    (txc.parse_duration, DURATIONS),
+    (txc.parse_duration_seconds, DURATIONS),
+    (txc.parse_time, TIMES),
+    (txc.parse_time_seconds, TIMES),
+)
+
+
+def run_benchmark(function, strings, number=20):
+    def run():
+        for string in strings:
+            function(string)
+
+    def run_uncached():
+        for string in strings:
+            function.__wrapped__(string)
+
+    calls = len(strings) * number
+    cached = min(timeit.repeat(run, number=number, repeat=5)) / calls
+    uncached = min(timeit.repeat(run_uncached, number=number, repeat=5)) / calls
+    return cached, uncached
+
+
+def main():
+    print(f"{'function':<24} {'cached':>12} {'uncached':>12}")
+    for function, strings in FUNCTIONS:
+        cached, uncached = run_benchmark(function, strings)
+        print(
+            f"{function.__name__:<24} {cached * 1e9:>9.0f} ns {uncached * 1e9:>9.0f} ns"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Benchmark suite: parse time, peak memory, get_times throughput and calendar
+evaluation, on a generated document.
+
+    python -m benchmarks.suite [--journeys 200 ...] [--output results.json]
+    python -m benchmarks.suite --baseline results.json
+
+Results are printed, and written as JSON if --output is given. With --baseline,
+each result is compared with the one in a previous JSON file, and the exit
+status is 1 if any is worse by more than --threshold (10% by default).
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from txc import calendars, txc
+
+from . import generate
+
+# name: (unit, whether higher is better)
+RESULTS = {
+    "parse": ("s", False),
+    "parse peak memory": ("MiB", False),
+    "get_times": ("stops/s", True),
+    "calendars": ("journeys/s", True),
+}
+
+
+def get_best_time(function, repeat) -> float:
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(path, repeat=3) -> dict:
+    results = {}
+
+    results["parse"] = get_best_time(lambda: txc.TransXChange(path), repeat)
+
+    gc.collect()
+    tracemalloc.start()
+    document = txc.TransXChange(path)
+    results["parse peak memory"] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+
+    # (compile each JourneyPattern's template first, as it's only done once)
+    stop_count = sum(len(list(journey.get_times())) for journey in document.journeys)
+
+    def get_times():
+        for journey in document.journeys:
+            for _ in journey.get_times():
+                pass
+
+    results["get_times"] = stop_count / get_best_time(get_times, repeat)
+
+    def get_days():
+        dates = calendars.Calendars(
+            datetime.date(2025, 1, 1), datetime.date(2025, 12, 31)
+        )
+        for journey in document.journeys:
+            dates.get_journey_days(journey, document.services[journey.service_ref])
+
+    results["calendars"] = len(document.journeys) / get_best_time(get_days, repeat)
+
+    return results
+
+
+def compare(results, baseline, threshold) -> list:
+    """Print the change in each result, and return the names of regressions"""
+    regressions = []
+    for name, (unit, higher_is_better) in RESULTS.items():
+        value = results[name]
+        old_value = baseline.get(name)
+        if not old_value:
+            print(f"{name:<20} {value:>14.3f} {unit}")
+            continue
+        change = value / old_value - 1
+        if (change < -threshold) if higher_is_better else (change > threshold):
+            regressions.append(name)
+        print(f"{name:<20} {value:>14.3f} {unit:<11} {change:>+8.1%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--path", help="an existing document, instead of generating")
+    generate.add_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="a file to write the results to, as JSON")
+    parser.add_argument("--baseline", help="a JSON file of results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.path:
+        parameters = {"path": args.path}
+        results = run(args.path, args.repeat)
+    else:
+        parameters = generate.get_kwargs(args)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "generated.xml")
+            with open(path, "w") as open_file:
+                generate.generate(open_file, **parameters)
+            results = run(path, args.repeat)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as open_file:
+            baseline = json.load(open_file)
+        if baseline["parameters"] != parameters:
+            print("warning: the baseline was run with different parameters")
+        baseline = baseline["results"]
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.output:
+        with open(args.output, "w") as open_file:
+            json.dump(
+                {
+                    "parameters": parameters,
+                    "python": platform.python_version(),
+                    "results": results,
+                },
+                open_file,
+                indent=2,
+            )
+
+    if regressions:
+        print(f"regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
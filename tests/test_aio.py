@@ -0,0 +1,89 @@
+"""Tests for parsing documents in asyncio programs"""
+
+import asyncio
+import io
+import os
+import zipfile
+from unittest import IsolatedAsyncioTestCase
+
+from txc import aio, stats, txc
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "test_data")
+SAMPLE_FILE = os.path.join(TEST_DATA_DIR, "sample.xml")
+
+
+async def iter_chunks(data, chunk_size):
+    for i in range(0, len(data), chunk_size):
+        yield data[i : i + chunk_size]
+        await asyncio.sleep(0)
+
+
+class DocumentStreamTest(IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(SAMPLE_FILE, "rb") as open_file:
+            cls.data = open_file.read()
+
+    async def test_iter_chunks(self):
+        stream = aio.DocumentStream(iter_chunks(self.data, 100))
+        self.assertEqual(stream.document.services, {})
+
+        objects = [obj async for obj in stream]
+        self.assertEqual(
+            [type(obj) for obj in objects], [txc.Service] * 2 + [txc.VehicleJourney] * 7
+        )
+        self.assertEqual(objects[0].service_code, "PB0000001:1")
+        self.assertEqual(objects[-1].code, "VJ7")
+
+        document = stream.document
+        self.assertEqual(document.attributes["RevisionNumber"], "3")
+        self.assertEqual(len(document.stops), 4)
+        self.assertEqual(document.journeys, [])
+
+        # the same as parsing it all at once
+        self.assertEqual(
+            [
+                [cell.departure_time for cell in journey.get_times()]
+                for journey in objects[2:]
+            ],
+            [
+                [cell.departure_time for cell in journey.get_times()]
+                for journey in txc.TransXChange(SAMPLE_FILE).journeys
+            ],
+        )
+
+    async def test_stream_reader(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(self.data)
+        reader.feed_eof()
+        stream = aio.DocumentStream(reader, chunk_size=1000, low_memory=True)
+        objects = [obj async for obj in stream]
+        self.assertEqual(len(objects), 9)
+        self.assertEqual(stream.document.operators[0].id, "O1")
+
+    async def test_sections(self):
+        stream = aio.DocumentStream(iter_chunks(self.data, 100), sections={"Services"})
+        objects = [obj async for obj in stream]
+        self.assertEqual(
+            [obj.service_code for obj in objects], ["PB0000001:1", "PB0000001:2"]
+        )
+
+    async def test_stats(self):
+        with self.assertRaises(ValueError):
+            aio.DocumentStream(iter_chunks(self.data, 100), stats=stats.ParseStats())
+
+    async def test_iter_zip(self):
+        inner = io.BytesIO()
+        with zipfile.ZipFile(inner, "w") as archive:
+            archive.writestr("b.xml", self.data)
+        open_file = io.BytesIO()
+        with zipfile.ZipFile(open_file, "w") as archive:
+            archive.writestr("a.xml", self.data)
+            archive.writestr("readme.txt", "not a TransXChange document")
+            archive.writestr("inner.zip", inner.getvalue())
+
+        names = []
+        async for name, stream in aio.iter_zip(open_file, chunk_size=1000):
+            names.append(name)
+            self.assertEqual(len([obj async for obj in stream]), 9)
+        self.assertEqual(names, ["a.xml", "inner.zip/b.xml"])
@@ -0,0 +1,106 @@
+"""Tests for parsing many documents at once"""
+
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from unittest import TestCase
+
+from txc import bulk, registry
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "test_data")
+SAMPLE_FILE = os.path.join(TEST_DATA_DIR, "sample.xml")
+
+
+class BulkTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+
+        inner = io.BytesIO()
+        with zipfile.ZipFile(inner, "w") as archive:
+            archive.write(SAMPLE_FILE, "c.xml")
+
+        cls.zip_path = os.path.join(cls.directory, "archive.zip")
+        with zipfile.ZipFile(cls.zip_path, "w") as archive:
+            archive.write(SAMPLE_FILE, "b.xml")
+            archive.write(SAMPLE_FILE, "a/a.xml")
+            archive.writestr("readme.txt", "not a TransXChange document")
+            archive.writestr("inner.zip", inner.getvalue())
+
+        cls.xml_directory = os.path.join(cls.directory, "xml")
+        os.makedirs(os.path.join(cls.xml_directory, "a"))
+        shutil.copy(SAMPLE_FILE, os.path.join(cls.xml_directory, "b.xml"))
+        shutil.copy(SAMPLE_FILE, os.path.join(cls.xml_directory, "a", "a.xml"))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def test_get_names(self):
+        self.assertEqual(
+            bulk.get_names(self.zip_path),
+            [("b.xml",), ("a/a.xml",), ("inner.zip", "c.xml")],
+        )
+        self.assertEqual(
+            bulk.get_names(self.xml_directory),
+            [(os.path.join("a", "a.xml"),), ("b.xml",)],
+        )
+
+    def test_load_zip_threads(self):
+        documents = list(bulk.load(self.zip_path, workers=2, threads=True))
+        self.assertEqual(
+            [name for name, _ in documents], ["b.xml", "a/a.xml", "inner.zip/c.xml"]
+        )
+        for _, document in documents:
+            self.assertEqual(len(document.journeys), 7)
+            self.assertEqual(document.attributes["RevisionNumber"], "3")
+
+    def test_load_zip_processes(self):
+        documents = list(
+            bulk.load(self.zip_path, workers=2, threads=False, in_flight=1)
+        )
+        self.assertEqual(len(documents), 3)
+        for _, document in documents:
+            self.assertEqual(len(document.services), 2)
+            self.assertEqual(len(document.journeys), 7)
+
+    def test_load_directory(self):
+        documents = list(bulk.load(self.xml_directory, workers=1, threads=True))
+        self.assertEqual(
+            [name for name, _ in documents], [os.path.join("a", "a.xml"), "b.xml"]
+        )
+        self.assertEqual(len(documents[0][1].stops), 4)
+
+    def test_load_stop_registry(self):
+        stop_registry = registry.StopRegistry()
+        documents = [
+            document
+            for _, document in bulk.load(
+                self.zip_path, workers=2, stop_registry=stop_registry
+            )
+        ]
+        self.assertEqual(len(stop_registry), 4)
+        for document in documents[1:]:
+            self.assertIs(document.stops["1500A"], documents[0].stops["1500A"])
+
+        with self.assertRaises(ValueError):
+            next(bulk.load(self.zip_path, threads=False, stop_registry=stop_registry))
+
+    def test_load_bad_document(self):
+        path = os.path.join(self.directory, "bad.zip")
+        with open(SAMPLE_FILE, "rb") as open_file:
+            data = open_file.read()
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr("a.xml", data)
+            archive.writestr("b.xml", data[:500])  # cut off
+            archive.writestr("c.xml", data)
+
+        for threads in (True, False):
+            documents = list(bulk.load(path, workers=2, threads=threads))
+            self.assertEqual(
+                [name for name, _ in documents], ["a.xml", "b.xml", "c.xml"]
+            )
+            self.assertIsInstance(documents[1][1], SyntaxError)
+            self.assertEqual(len(documents[2][1].journeys), 7)
@@ -0,0 +1,78 @@
+"""Tests for caching parsed documents"""
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase, mock
+
+from txc import cache, registry, stats
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "test_data")
+SAMPLE_FILE = os.path.join(TEST_DATA_DIR, "sample.xml")
+
+
+class DocumentCacheTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = cache.DocumentCache(os.path.join(self.directory, "cache.sqlite"))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.directory)
+
+    def get_keys(self):
+        return [
+            key
+            for (key,) in self.cache.connection.execute(
+                "SELECT key FROM documents ORDER BY last_used"
+            )
+        ]
+
+    def test_load(self):
+        document = self.cache.load(SAMPLE_FILE)
+        self.assertEqual(len(document.journeys), 7)
+        self.assertEqual(len(self.get_keys()), 1)
+
+        with mock.patch("txc.cache.TransXChange") as transxchange:
+            with open(SAMPLE_FILE, "rb") as open_file:
+                cached_document = self.cache.load(open_file)
+            transxchange.assert_not_called()
+        self.assertEqual(cached_document.attributes, document.attributes)
+        self.assertEqual(
+            [
+                [cell.departure_time for cell in journey.get_times()]
+                for journey in cached_document.journeys
+            ],
+            [
+                [cell.departure_time for cell in journey.get_times()]
+                for journey in document.journeys
+            ],
+        )
+        self.assertEqual(len(self.get_keys()), 1)
+
+        # different arguments, different key
+        document = self.cache.load(SAMPLE_FILE, low_memory=True)
+        self.assertEqual(document.operators[0].id, "O1")
+        self.assertEqual(len(self.get_keys()), 2)
+
+        with self.assertRaises(ValueError):
+            self.cache.load(SAMPLE_FILE, stream_journeys=True)
+        with self.assertRaises(ValueError):
+            self.cache.load(SAMPLE_FILE, stop_registry=registry.StopRegistry())
+        with self.assertRaises(ValueError):
+            self.cache.load(SAMPLE_FILE, stats=stats.ParseStats())
+
+    def test_evict(self):
+        self.cache.load(SAMPLE_FILE)
+        self.cache.load(SAMPLE_FILE, sections={"Services"})
+        first, second = self.get_keys()
+
+        # using the first document makes the second the least recently used
+        self.cache.load(SAMPLE_FILE)
+        self.assertEqual(self.get_keys(), [second, first])
+
+        (self.cache.max_size,) = self.cache.connection.execute(
+            "SELECT size FROM documents WHERE key = ?", (first,)
+        ).fetchone()
+        self.cache.evict()
+        self.assertEqual(self.get_keys(), [first])
@@ -0,0 +1,65 @@
+"""Tests for exporting stop times as columns"""
+
+import os
+from unittest import TestCase, skipIf
+
+from txc import columns, txc
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "test_data")
+SAMPLE_FILE = os.path.join(TEST_DATA_DIR, "sample.xml")
+
+
+class StopTimeColumnsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(SAMPLE_FILE) as f:
+            cls.txc = txc.TransXChange(f)
+        cls.stop_times = columns.get_stop_time_columns(cls.txc)
+
+    def test_same_as_get_times(self):
+        """Test the columns match the Cells from VehicleJourney.get_times"""
+        stop_times = self.stop_times
+        cells = [
+            (journey, cell)
+            for journey in self.txc.journeys
+            for cell in journey.get_times()
+        ]
+        self.assertEqual(len(stop_times), len(cells))
+        self.assertEqual(len(stop_times), 25)
+
+        for i, (journey, cell) in enumerate(cells):
+            self.assertIs(stop_times.journeys[stop_times.journey[i]], journey)
+            self.assertEqual(
+                stop_times.stops[stop_times.stop[i]].atco_code,
+                cell.stopusage.stop.atco_code,
+            )
+            self.assertEqual(stop_times.arrival[i], cell.arrival_time.total_seconds())
+            self.assertEqual(
+                stop_times.departure[i], cell.departure_time.total_seconds()
+            )
+            self.assertEqual(
+                stop_times.activities[stop_times.activity[i]], cell.activity
+            )
+
+    def test_columns(self):
+        stop_times = self.stop_times
+        self.assertEqual(list(stop_times.sequence[:5]), [0, 1, 2, 3, 0])
+        self.assertEqual(list(stop_times.journey[:5]), [0, 0, 0, 0, 1])
+        self.assertEqual(
+            [stop.atco_code for stop in stop_times.stops],
+            ["1500A", "1500B", "1500C", "1500D", "1500E"],
+        )
+        self.assertEqual(stop_times.activities, [None, "pickUp", "setDown"])
+
+        # VJ6 departs after midnight
+        self.assertEqual(stop_times.departure[-7], 86400 + 23 * 3600 + 50 * 60)
+
+    @skipIf(columns.numpy is None, "NumPy is not installed")
+    def test_to_numpy(self):
+        arrays = self.stop_times.to_numpy()
+        self.assertEqual(arrays["arrival"].tolist(), self.stop_times.arrival.tolist())
+
+    @skipIf(columns.numpy is not None, "NumPy is installed")
+    def test_to_numpy_without_numpy(self):
+        with self.assertRaises(ImportError):
+            self.stop_times.to_numpy()
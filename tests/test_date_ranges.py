@@ -1,10 +1,13 @@
 """Tests for timetables and date ranges"""
 
+import os
 import xml.etree.ElementTree as ET
 from datetime import date
 from unittest import TestCase
 
-from txc import txc
+from txc import calendars, txc
+
+SAMPLE_FILE = os.path.join(os.path.dirname(__file__), "..", "test_data", "sample.xml")
 
 
 class DateRangeTest(TestCase):
@@ -69,3 +72,111 @@ class DateRangeTest(TestCase):
         )
         operating_profile = txc.OperatingProfile(element, None)
         self.assertEqual(str(operating_profile.regular_days), "[Saturday, Sunday]")
+
+
+class CalendarsTest(TestCase):
+    """Tests for evaluating OperatingProfiles over a range of dates"""
+
+    @classmethod
+    def setUpClass(cls):
+        with open(SAMPLE_FILE) as f:
+            cls.txc = txc.TransXChange(f)
+        cls.calendars = calendars.Calendars(
+            date(2025, 9, 1),
+            date(2025, 12, 31),
+            {
+                "ChristmasDay": [date(2025, 12, 25)],
+                "BoxingDay": [date(2025, 12, 26)],
+                "LateSummerBankHolidayNotScotland": [date(2025, 8, 25)],
+            },
+        )
+
+    def get_dates(self, code):
+        journey = next(j for j in self.txc.journeys if j.code == code)
+        service = self.txc.services[journey.service_ref]
+        days = self.calendars.get_journey_days(journey, service)
+        return self.calendars.get_dates(days)
+
+    def test_regular_days(self):
+        dates = self.get_dates("VJ1")  # Monday to Friday, not bank holidays
+        self.assertEqual(len(dates), 86)
+        self.assertEqual(dates[0], date(2025, 9, 1))
+        self.assertNotIn(date(2025, 12, 25), dates)
+        self.assertIn(date(2025, 12, 24), dates)
+
+        dates = self.get_dates("VJ7")  # Saturdays, open-ended operating period
+        self.assertEqual(len(dates), 17)
+        self.assertTrue(all(d.weekday() == 5 for d in dates))
+
+    def test_special_days(self):
+        dates = self.get_dates("VJ2")  # Mondays and Wednesdays
+        self.assertEqual(len(dates), 34)
+        self.assertEqual(
+            dates[-3:], [date(2025, 12, 17), date(2025, 12, 29), date(2025, 12, 31)]
+        )
+
+    def test_serviced_organisation(self):
+        dates = self.get_dates("VJ5")  # school days
+        self.assertEqual(dates[0], date(2025, 9, 1))
+        self.assertEqual(dates[-1], date(2025, 12, 19))
+        self.assertNotIn(date(2025, 10, 28), dates)
+        self.assertEqual(len(dates), 75)
+
+    def test_holidays_only(self):
+        element = ET.fromstring(
+            """
+            <OperatingProfile>
+                <RegularDayType>
+                    <HolidaysOnly />
+                </RegularDayType>
+            </OperatingProfile>
+        """
+        )
+        operating_profile = txc.OperatingProfile(element, None)
+        days = self.calendars.get_days(operating_profile)
+        self.assertEqual(
+            self.calendars.get_dates(days), [date(2025, 12, 25), date(2025, 12, 26)]
+        )
+        self.assertTrue(self.calendars.runs_on(days, date(2025, 12, 25)))
+        self.assertFalse(self.calendars.runs_on(days, date(2025, 12, 27)))
+        self.assertFalse(self.calendars.runs_on(days, date(2026, 12, 25)))
+
+    def test_week_of_month(self):
+        element = ET.fromstring(
+            """
+            <OperatingProfile>
+                <RegularDayType>
+                    <DaysOfWeek>
+                        <Tuesday />
+                    </DaysOfWeek>
+                </RegularDayType>
+                <PeriodicDayType>
+                    <WeekOfMonth>
+                        <WeekNumber>first</WeekNumber>
+                        <WeekNumber>third</WeekNumber>
+                    </WeekOfMonth>
+                </PeriodicDayType>
+            </OperatingProfile>
+        """
+        )
+        operating_profile = txc.OperatingProfile(element, None)
+        dates = self.calendars.get_dates(self.calendars.get_days(operating_profile))
+        self.assertEqual(len(dates), 8)
+        self.assertEqual(
+            dates[:3], [date(2025, 9, 2), date(2025, 9, 16), date(2025, 10, 7)]
+        )
+
+        # the last week of the month
+        week_of_month = element.find("PeriodicDayType/WeekOfMonth")
+        week_of_month.clear()
+        ET.SubElement(week_of_month, "WeekNumber").text = "last"
+        operating_profile = txc.OperatingProfile(element, None)
+        dates = self.calendars.get_dates(self.calendars.get_days(operating_profile))
+        self.assertEqual(dates[0], date(2025, 9, 30))
+        self.assertEqual(len(dates), 4)
+
+    def test_memoised(self):
+        journeys = self.txc.get_journeys("PB0000001:1", "L1")
+        service = self.txc.services["PB0000001:1"]
+        days = [self.calendars.get_journey_days(j, service) for j in journeys]
+        self.assertIs(days[0], days[2])
@@ -0,0 +1,63 @@
+"""Tests for comparing revisions of a document"""
+
+import io
+import os
+import pickle
+from unittest import TestCase
+
+from txc import diff, txc
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "test_data")
+SAMPLE_FILE = os.path.join(TEST_DATA_DIR, "sample.xml")
+
+
+class DiffTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(SAMPLE_FILE) as open_file:
+            cls.xml = open_file.read()
+        cls.document = txc.TransXChange(io.StringIO(cls.xml))
+
+    def get_revision(self, *replacements):
+        xml = self.xml
+        for old, new in replacements:
+            self.assertIn(old, xml)
+            xml = xml.replace(old, new, 1)
+        return txc.TransXChange(io.StringIO(xml))
+
+    def test_same(self):
+        changes = diff.diff(self.document, txc.TransXChange(SAMPLE_FILE))
+        self.assertFalse(changes)
+        self.assertEqual(changes.journeys.changed, [])
+
+    def test_diff(self):
+        revision = self.get_revision(
+            ("<DepartureTime>08:00:00", "<DepartureTime>08:05:00"),
+            ("<CommonName>High Street", "<CommonName>Market Place"),
+            ("<VehicleJourneyCode>VJ7<", "<VehicleJourneyCode>VJ8<"),
+        )
+        changes = diff.diff(self.document, revision)
+        self.assertTrue(changes)
+        self.assertEqual(changes.stops.changed, ["1500B"])
+        self.assertFalse(changes.journey_pattern_sections)
+        self.assertFalse(changes.journey_patterns)
+        self.assertFalse(changes.services)
+        self.assertEqual(changes.journeys.added, ["VJ8"])
+        self.assertEqual(changes.journeys.removed, ["VJ7"])
+        self.assertEqual(changes.journeys.changed, ["VJ2"])
+
+    def test_section_changed(self):
+        """A change to a JourneyPatternSection changes the journeys using it"""
+        revision = self.get_revision(("<RunTime>PT6M", "<RunTime>PT7M"))
+        fingerprints = pickle.loads(pickle.dumps(diff.Fingerprints(self.document)))
+        changes = diff.diff(fingerprints, revision)
+        self.assertEqual(changes.journey_pattern_sections.changed, ["JPS2"])
+        self.assertEqual(changes.journey_patterns.changed, [("PB0000001:1", "JP2")])
+        self.assertEqual(changes.journeys.changed, ["VJ5", "VJ6"])
+        self.assertEqual(changes.stops.changed, [])
+
+    def test_stop_moved(self):
+        revision = self.get_revision(("<Latitude>51.8920", "<Latitude>51.8921"))
+        changes = diff.diff(self.document, revision)
+        self.assertEqual(changes.stops.changed, ["1500B"])
+        self.assertFalse(changes.journeys)
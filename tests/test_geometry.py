@@ -0,0 +1,85 @@
+"""Tests for RouteLink geometry"""
+
+import os
+import struct
+import xml.etree.ElementTree as ET
+from array import array
+from unittest import TestCase
+
+from txc import geometry, txc
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "test_data")
+SAMPLE_FILE = os.path.join(TEST_DATA_DIR, "sample.xml")
+
+
+class GeometryTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.document = txc.TransXChange(SAMPLE_FILE)
+        cls.links = {
+            link.id: link
+            for section in cls.document.route_sections.values()
+            for link in section.links
+        }
+
+    def test_coordinates(self):
+        link = self.links["RL2"]
+        self.assertEqual(link.coordinates, array("d", [0.905, 51.892, 0.91, 51.895]))
+        self.assertIsNone(link.srid)
+        self.assertEqual(link.wkt(), "LINESTRING(0.905 51.892, 0.91 51.895)")
+        self.assertEqual(
+            link.geojson(),
+            {"type": "LineString", "coordinates": [[0.905, 51.892], [0.91, 51.895]]},
+        )
+        point, _ = link.track
+        self.assertEqual((point.longitude, point.latitude), ("0.905", "51.892"))
+
+        # British National Grid
+        link = self.links["RL4"]
+        self.assertEqual(link.srid, 27700)
+        self.assertEqual(
+            link.wkt(), "SRID=27700;LINESTRING(600500.0 226500.0, 600100.0 226000.0)"
+        )
+        self.assertEqual(link.track[0].wkt(), "SRID=27700;POINT(600500.0 226500.0)")
+
+    def test_wkb(self):
+        wkb = self.links["RL2"].wkb()
+        self.assertEqual(struct.unpack_from("<BII", wkb), (1, 2, 2))
+        self.assertEqual(
+            struct.unpack_from("<4d", wkb, 9), (0.905, 51.892, 0.91, 51.895)
+        )
+
+        wkb = self.links["RL4"].wkb()
+        self.assertEqual(struct.unpack_from("<BIII", wkb), (1, 0x20000002, 27700, 2))
+        self.assertEqual(len(wkb), 13 + 4 * 8)
+
+    def test_merge(self):
+        coordinates, srid = self.document.routes["R1"].get_coordinates(
+            self.document.route_sections
+        )
+        self.assertIsNone(srid)
+        # the shared points where links join are only included once
+        self.assertEqual(len(coordinates), 5 * 2)
+        self.assertEqual(coordinates[:2], array("d", [0.901, 51.889]))
+        self.assertEqual(coordinates[-2:], array("d", [0.92, 51.9]))
+
+        self.assertEqual(
+            geometry.merge([array("d", [0, 0, 1, 1]), array("d", [2, 2, 3, 3])]),
+            array("d", [0, 0, 1, 1, 2, 2, 3, 3]),
+        )
+        self.assertEqual(
+            self.document.routes["R2"].get_coordinates({}), (array("d"), None)
+        )
+
+    def test_invalid_coordinates(self):
+        locations = [
+            ET.fromstring(f"<Location><Longitude>{lon}</Longitude></Location>")
+            for lon in ("0.905", "0.9o5", "nan", "0.91")
+        ]
+        for location, lat in zip(locations, ("51.892", "51.893", "51.894", "51.895")):
+            ET.SubElement(location, "Latitude").text = lat
+        with self.assertLogs("txc.txc", "WARNING") as logs:
+            coordinates, srid = txc.get_coordinates(locations)
+        self.assertEqual(coordinates, array("d", [0.905, 51.892, 0.91, 51.895]))
+        self.assertIsNone(srid)
+        self.assertEqual(len(logs.output), 2)
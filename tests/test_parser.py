@@ -1,17 +1,21 @@
 """Tests for the TransXChange parser using real test data"""
 
+import io
 import os
-from unittest import TestCase
+import tempfile
+import xml.etree.ElementTree as ET
+from unittest import TestCase, mock
 from datetime import timedelta
 
 
-from txc import txc
+from txc import stats, txc
 
 TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "test_data")
 COLCHESTER_FILE = os.path.join(
     TEST_DATA_DIR,
     "54-FEAO054--FESX-Colchester-2025-09-07-CR20_Exports-CF_C59_Update-BODS_V1_1.xml",
 )
+SAMPLE_FILE = os.path.join(TEST_DATA_DIR, "sample.xml")
 
 
 class TransXChangeParserTest(TestCase):
@@ -141,6 +145,431 @@ class TransXChangeParserTest(TestCase):
             break  # Just test one service
 
 
+class SampleDocumentTest(TestCase):
+    """Tests using a small hand-written document"""
+
+    @classmethod
+    def setUpClass(cls):
+        with open(SAMPLE_FILE) as f:
+            cls.txc = txc.TransXChange(f)
+
+    def test_get_journeys(self):
+        """Test journeys are indexed by service and line"""
+        journeys = self.txc.get_journeys("PB0000001:1", "L1")
+        self.assertEqual([j.code for j in journeys], ["VJ1", "VJ2", "VJ4", "VJ6"])
+
+        # inherits its JourneyPattern from VJ1 via VehicleJourneyRef
+        journeys = self.txc.get_journeys("PB0000001:1", "L2")
+        self.assertEqual([j.code for j in journeys], ["VJ3", "VJ5"])
+        self.assertIs(journeys[0].journey_pattern, self.txc.journeys[0].journey_pattern)
+
+        self.assertEqual(self.txc.get_journeys("PB0000001:2", "L1"), [])
+
+    def test_get_lines(self):
+        """Test iterating over lines with their journeys"""
+        lines = [
+            (service.service_code, line.id, len(journeys))
+            for service, line, journeys in self.txc.get_lines()
+        ]
+        self.assertEqual(
+            lines,
+            [
+                ("PB0000001:1", "L1", 4),
+                ("PB0000001:1", "L2", 2),
+                ("PB0000001:2", "L3", 1),
+            ],
+        )
+
+    def test_get_times(self):
+        """Test journeys sharing a JourneyPattern's compiled template"""
+        journeys = {journey.code: journey for journey in self.txc.journeys}
+        pattern = journeys["VJ1"].journey_pattern
+        self.assertIs(pattern.get_template(), pattern.get_template())
+
+        times = [
+            (cell.stopusage.stop.atco_code, cell.arrival_time, cell.departure_time)
+            for cell in journeys["VJ2"].get_times()
+        ]
+        self.assertEqual(
+            times,
+            [
+                ("1500A", timedelta(hours=8), timedelta(hours=8)),
+                ("1500B", timedelta(hours=8, minutes=5), timedelta(hours=8, minutes=6)),
+                ("1500C", timedelta(hours=8, minutes=9), timedelta(hours=8, minutes=9)),
+                (
+                    "1500D",
+                    timedelta(hours=8, minutes=13),
+                    timedelta(hours=8, minutes=13),
+                ),
+            ],
+        )
+        self.assertEqual(
+            [cell.activity for cell in journeys["VJ2"].get_times()],
+            ["pickUp", None, None, "setDown"],
+        )
+
+        # VehicleJourneyTimingLink overrides the RunTime and WaitTime
+        times = [cell.departure_time for cell in journeys["VJ4"].get_times()]
+        self.assertEqual(
+            times,
+            [
+                timedelta(hours=10),
+                timedelta(hours=10, minutes=8),
+                timedelta(hours=10, minutes=18),
+                timedelta(hours=10, minutes=22),
+            ],
+        )
+
+        # StartDeadRun
+        times = [
+            (cell.stopusage.stop.atco_code, cell.departure_time)
+            for cell in journeys["VJ5"].get_times()
+        ]
+        self.assertEqual(
+            times,
+            [
+                ("1500E", timedelta(hours=15, minutes=30)),
+                ("1500A", timedelta(hours=15, minutes=32)),
+            ],
+        )
+
+    def test_operating_profiles(self):
+        """Test OperatingProfile fingerprints only include the ServicedOrganisations
+        actually referenced, and identical profiles are shared
+        """
+        journeys = {journey.code: journey for journey in self.txc.journeys}
+        operating_profile = journeys["VJ5"].operating_profile
+        (serviced_organisation,) = operating_profile.hash[4]
+        self.assertEqual(serviced_organisation[:2], (True, True))
+        self.assertEqual(serviced_organisation[2][0], "SCH")
+        self.assertEqual(len(self.txc.operating_profiles), 4)
+        self.assertIs(
+            self.txc.operating_profiles[operating_profile.hash], operating_profile
+        )
+
+        element = ET.fromstring(
+            """
+            <OperatingProfile>
+                <RegularDayType>
+                    <DaysOfWeek>
+                        <Monday />
+                        <Wednesday />
+                    </DaysOfWeek>
+                </RegularDayType>
+                <SpecialDaysOperation>
+                    <DaysOfNonOperation>
+                        <DateRange>
+                            <StartDate>2025-12-22</StartDate>
+                            <EndDate>2025-12-24</EndDate>
+                        </DateRange>
+                    </DaysOfNonOperation>
+                </SpecialDaysOperation>
+                <BankHolidayOperation>
+                    <DaysOfNonOperation>
+                        <ChristmasDay />
+                        <BoxingDay />
+                    </DaysOfNonOperation>
+                </BankHolidayOperation>
+            </OperatingProfile>
+            """
+        )
+        self.assertIs(
+            txc.get_operating_profile(element, None, self.txc.operating_profiles),
+            journeys["VJ2"].operating_profile,
+        )
+        self.assertEqual(
+            journeys["VJ2"].operating_profile.nonoperation_bank_holiday_names,
+            ("ChristmasDay", "BoxingDay"),
+        )
+
+        # the same dates, but with a note, isn't the same
+        date_range = element.find("SpecialDaysOperation/DaysOfNonOperation/DateRange")
+        ET.SubElement(date_range, "Note").text = "Christmas"
+        operating_profile = txc.get_operating_profile(
+            element, None, dict(self.txc.operating_profiles)
+        )
+        self.assertIsNot(operating_profile, journeys["VJ2"].operating_profile)
+        self.assertEqual(operating_profile.nonoperation_days[0].note, "Christmas")
+
+        # nor is it with a PeriodicDayType
+        element.remove(element.find("SpecialDaysOperation"))
+        plain = txc.get_operating_profile(element, None, {})
+        periodic_day_type = ET.SubElement(element, "PeriodicDayType")
+        ET.SubElement(periodic_day_type, "FirstDayOfMonth")
+        operating_profiles = {plain.hash: plain}
+        operating_profile = txc.get_operating_profile(element, None, operating_profiles)
+        self.assertIsNot(operating_profile, plain)
+        self.assertTrue(operating_profile.periodic_day_type)
+        self.assertIsNone(operating_profile.week_of_month)
+
+        # or with different week numbers
+        periodic_day_type.remove(periodic_day_type[0])
+        week_of_month = ET.SubElement(periodic_day_type, "WeekOfMonth")
+        ET.SubElement(week_of_month, "WeekNumber").text = "first"
+        first = txc.get_operating_profile(element, None, operating_profiles)
+        ET.SubElement(week_of_month, "WeekNumber").text = "third"
+        first_and_third = txc.get_operating_profile(element, None, operating_profiles)
+        self.assertIsNot(first, first_and_third)
+        self.assertEqual(first_and_third.week_of_month, "first")
+        self.assertEqual(first_and_third.weeks_of_month, ("first", "third"))
+        self.assertEqual(len(operating_profiles), 4)
+
+    def test_missing_stops(self):
+        """Test a stop not in StopPoints is shared between timing links"""
+        self.assertNotIn("1500E", self.txc.stops)
+        pattern = self.txc.services["PB0000001:1"].journey_patterns["JP2"]
+        first, second = pattern.get_timinglinks()
+        self.assertIs(first.destination.stop, second.origin.stop)
+        self.assertIs(first.destination.stop, self.txc.missing_stops["1500E"])
+        self.assertEqual(str(first.destination.stop), "1500E")
+
+        pattern = self.txc.services["PB0000001:1"].journey_patterns["JP1"]
+        timinglinks = list(pattern.get_timinglinks())
+        self.assertIs(
+            timinglinks[0].origin.timingstatus, second.destination.timingstatus
+        )
+
+    def test_low_memory(self):
+        """Test low_memory mode gives the same result, without elements"""
+        with open(SAMPLE_FILE) as f:
+            document = txc.TransXChange(f, low_memory=True)
+
+        self.assertEqual(document.attributes["FileName"], "sample.xml")
+        self.assertEqual(
+            [journey.code for journey in document.journeys],
+            [journey.code for journey in self.txc.journeys],
+        )
+        for journey, other_journey in zip(document.journeys, self.txc.journeys):
+            self.assertEqual(
+                [cell.departure_time for cell in journey.get_times()],
+                [cell.departure_time for cell in other_journey.get_times()],
+            )
+        self.assertEqual(
+            document.get_journeys("PB0000001:1", "L2")[0].journey_pattern.id, "JP1"
+        )
+
+        self.assertIsNone(document.stops["1500A"].element)
+        self.assertIsNone(document.missing_stops["1500E"].element)
+        self.assertIsNotNone(self.txc.stops["1500A"].element)
+
+        (operator,) = document.operators
+        self.assertEqual(operator.id, "O1")
+        self.assertEqual(operator.national_operator_code, "SMPL")
+        self.assertEqual(str(operator), "Sample Buses Ltd")
+
+        garage = document.garages["G1"]
+        self.assertEqual(garage.name, "Sampleton Depot")
+        self.assertEqual(garage.location.latitude, "51.8880")
+        self.assertEqual(self.txc.garages["G1"].findtext("GarageName"), garage.name)
+
+        # operating profiles keep the bank holiday names, but not the elements
+        self.assertEqual(
+            [
+                profile.nonoperation_bank_holiday_names
+                for profile in document.operating_profiles.values()
+            ],
+            [
+                profile.nonoperation_bank_holiday_names
+                for profile in self.txc.operating_profiles.values()
+            ],
+        )
+        for profile in document.operating_profiles.values():
+            self.assertIsNone(profile.operation_bank_holidays)
+            self.assertIsNone(profile.nonoperation_bank_holidays)
+        self.assertTrue(
+            any(
+                profile.nonoperation_bank_holidays is not None
+                for profile in self.txc.operating_profiles.values()
+            )
+        )
+
+    def test_sections(self):
+        """Test only parsing some sections"""
+        document = txc.TransXChange(SAMPLE_FILE, sections={"Services"})
+        self.assertEqual(len(document.services), 2)
+        service = document.services["PB0000001:1"]
+        self.assertEqual([line.id for line in service.lines], ["L1", "L2"])
+        self.assertEqual(service.journey_patterns, {})
+        self.assertEqual(document.stops, {})
+        self.assertEqual(document.journeys, [])
+        self.assertEqual(document.attributes["RevisionNumber"], "3")
+
+        document = txc.TransXChange(
+            SAMPLE_FILE, sections=("StopPoints", "RouteSections", "Routes")
+        )
+        self.assertEqual(document.services, {})
+        self.assertEqual(len(document.stops), 4)
+        self.assertEqual(len(document.route_sections["RS1"].links), 3)
+        self.assertEqual(document.routes["R2"].route_section_refs, ["RS2"])
+
+        document = txc.TransXChange(
+            SAMPLE_FILE,
+            sections={"JourneyPatternSections", "Services", "VehicleJourneys"},
+        )
+        self.assertEqual(len(document.journeys), 7)
+        self.assertEqual(len(document.missing_stops), 5)
+
+        with self.assertRaises(ValueError):
+            txc.TransXChange(SAMPLE_FILE, sections={"StopAreas"})
+
+    def test_scan(self):
+        """Test reading just the headers"""
+        document = txc.scan(SAMPLE_FILE)
+        self.assertEqual(
+            document.attributes["ModificationDateTime"], "2025-08-20T14:30:00"
+        )
+        self.assertEqual(document.operators[0].get("id"), "O1")
+        service = document.services["PB0000001:2"]
+        self.assertEqual(str(service.operating_period), "2025-09-01 to None")
+        self.assertEqual(service.lines[0].line_name, "2")
+        self.assertEqual(document.journeys, [])
+        self.assertEqual(document.garages, {})
+
+    def test_get_diagnostics(self):
+        """Test counting unsupported things, without logging them"""
+        self.assertEqual(self.txc.get_diagnostics(), {"LineFontColour": 1})
+
+        with open(SAMPLE_FILE) as f:
+            xml = f.read()
+        xml = xml.replace(
+            "<LineName>2</LineName>",
+            "<LineName>2</LineName><LineImage><Url>2.png</Url></LineImage>",
+        ).replace(
+            "<Saturday />\n          </DaysOfWeek>\n        </RegularDayType>",
+            "<Saturday />\n          </DaysOfWeek>\n        </RegularDayType>"
+            "<PeriodicDayType><FirstDayOfMonth /></PeriodicDayType>",
+        )
+        with mock.patch.object(txc.ET, "tostring") as tostring:
+            document = txc.TransXChange(io.StringIO(xml))
+        tostring.assert_not_called()
+
+        self.assertEqual(
+            document.get_diagnostics(),
+            {"LineFontColour": 1, "LineImage": 1, "PeriodicDayType": 1},
+        )
+        self.assertTrue(document.services["PB0000001:2"].lines[0].image)
+
+        with self.assertLogs("txc.txc", "INFO") as logs:
+            txc.TransXChange(io.StringIO(xml))
+        self.assertEqual(len(logs.output), 3)
+
+    def test_stats(self):
+        """Test recording how long each section took"""
+        sections = []
+        parse_stats = stats.ParseStats(callback=sections.append)
+        document = txc.TransXChange(SAMPLE_FILE, stats=parse_stats)
+        self.assertEqual(len(document.journeys), 7)
+        self.assertEqual(document.operators[0].get("id"), "O1")
+
+        self.assertEqual(sections, list(parse_stats.sections.values()))
+        self.assertEqual(
+            list(parse_stats.sections),
+            [
+                "ServicedOrganisations",
+                "StopPoints",
+                "RouteSections",
+                "Routes",
+                "JourneyPatternSections",
+                "Operators",
+                "Services",
+                "VehicleJourneys",
+                "Garages",
+            ],
+        )
+        journeys = parse_stats.sections["VehicleJourneys"]
+        self.assertEqual(journeys.objects, 9)  # journeys and operating profiles
+        self.assertEqual(journeys.elements, 76)
+        self.assertEqual(parse_stats.largest_section, journeys)
+        self.assertEqual(parse_stats.sections["StopPoints"].objects, 4)
+        self.assertEqual(parse_stats.bytes_read, os.path.getsize(SAMPLE_FILE))
+        self.assertTrue(parse_stats.reader.file.closed)
+        self.assertIn("VehicleJourneys", str(parse_stats))
+
+        # the same way of parsing as without stats
+        with mock.patch("txc.txc.ET.iterparse", wraps=txc.ET.iterparse) as iterparse:
+            txc.TransXChange(SAMPLE_FILE, stats=stats.ParseStats())
+        iterparse.assert_called_once_with(mock.ANY)
+
+        # stopping early, after the last of some sections
+        parse_stats = stats.ParseStats()
+        txc.TransXChange(SAMPLE_FILE, sections={"StopPoints"}, stats=parse_stats)
+        self.assertEqual(list(parse_stats.sections)[-1], "StopPoints")
+        self.assertTrue(parse_stats.reader.file.closed)
+
+        # bytes, not characters
+        with open(SAMPLE_FILE) as open_file:
+            xml = open_file.read().replace("Sampleton", "Sämpleton")
+        parse_stats = stats.ParseStats()
+        txc.TransXChange(io.StringIO(xml), stats=parse_stats)
+        self.assertEqual(parse_stats.bytes_read, len(xml.encode()))
+        self.assertGreater(parse_stats.bytes_read, len(xml))
+
+    def test_stats_errors(self):
+        """Test the file opened for stats is closed even if parsing goes wrong"""
+        with open(SAMPLE_FILE) as open_file:
+            xml = open_file.read()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bad.xml")
+
+            # a VehicleJourney without a DepartureTime stops the parsing
+            with open(path, "w") as open_file:
+                open_file.write(
+                    xml.replace("<DepartureTime>", "<Departure>", 1).replace(
+                        "</DepartureTime>", "</Departure>", 1
+                    )
+                )
+            parse_stats = stats.ParseStats()
+            with self.assertLogs("txc.txc", "ERROR"):
+                document = txc.TransXChange(path, stats=parse_stats)
+            self.assertEqual(document.journeys, [])
+            self.assertTrue(parse_stats.reader.file.closed)
+
+            # a Service without a ServiceCode raises an error
+            with open(path, "w") as open_file:
+                open_file.write(
+                    xml.replace("<ServiceCode>PB0000001:1</ServiceCode>", "")
+                )
+            parse_stats = stats.ParseStats()
+            with self.assertRaises(AttributeError):
+                txc.TransXChange(path, stats=parse_stats)
+            self.assertTrue(parse_stats.reader.file.closed)
+
+    def test_stream_journeys(self):
+        """Test yielding journeys one at a time"""
+        document = txc.TransXChange(SAMPLE_FILE, stream_journeys=True)
+        self.assertEqual(len(document.services), 2)
+        self.assertEqual(document.garages, {})
+
+        journeys = list(document.iter_journeys())
+        self.assertEqual(document.journeys, [])
+        self.assertEqual(list(document.iter_journeys()), [])
+        self.assertEqual(document.garages["G1"].findtext("GarageCode"), "G1")
+        self.assertEqual(
+            [journey.code for journey in journeys],
+            [journey.code for journey in self.txc.journeys],
+        )
+        for journey, other_journey in zip(journeys, self.txc.journeys):
+            self.assertEqual(
+                [cell.departure_time for cell in journey.get_times()],
+                [cell.departure_time for cell in other_journey.get_times()],
+            )
+
+        # VJ3 (which refers to VJ1) before VJ1
+        with open(SAMPLE_FILE) as f:
+            head, *journey_elements = f.read().split("    <VehicleJourney>\n")
+        journey_elements.insert(0, journey_elements.pop(2))
+        xml = "    <VehicleJourney>\n".join([head, *journey_elements])
+
+        document = txc.TransXChange(io.StringIO(xml), stream_journeys=True)
+        journeys = list(document.iter_journeys())
+        self.assertEqual(
+            [journey.code for journey in journeys],
+            ["VJ1", "VJ3", "VJ2", "VJ4", "VJ5", "VJ6", "VJ7"],
+        )
+        self.assertEqual(journeys[1].journey_pattern.id, "JP1")
+        self.assertIs(journeys[1].operating_profile, journeys[0].operating_profile)
+
+
 class ParseTimeTest(TestCase):
     """Tests for the parse_time function"""
 
@@ -156,6 +585,11 @@ class ParseTimeTest(TestCase):
         result = txc.parse_time("00:00:00")
         self.assertEqual(result, timedelta())
 
+    def test_parse_time_seconds(self):
+        """Test parsing times as integer seconds"""
+        self.assertEqual(txc.parse_time_seconds("08:30:00"), 30600)
+        self.assertEqual(txc.parse_time_seconds("25:00:01"), 90001)
+
 
 class StopTest(TestCase):
     """Tests for the Stop class"""
@@ -512,6 +946,20 @@ class ParseDurationTest(TestCase):
         """Test that invalid duration raises error"""
         with self.assertRaises(ValueError):
             txc.parse_duration("10M")
+        with self.assertRaises(ValueError):
+            txc.parse_duration_seconds("PT1.5M")
+
+    def test_parse_duration_seconds(self):
+        """Test parsing durations as integer seconds"""
+        self.assertEqual(txc.parse_duration_seconds("PT2H15M30S"), 8130)
+        self.assertEqual(txc.parse_duration_seconds("-PT2M"), -120)
+        self.assertEqual(txc.parse_duration_seconds("PT0S"), 0)
+        self.assertEqual(txc.parse_duration_seconds("PT5M "), 300)
+        self.assertEqual(txc.parse_duration_seconds("\n  PT1H\n"), 3600)
+
+    def test_memoised(self):
+        """Test repeated durations share the same timedelta"""
+        self.assertIs(txc.parse_duration("PT7M"), txc.parse_duration("PT7M"))
 
 
 class StopWithStopPointRefTest(TestCase):
@@ -565,6 +1013,14 @@ class CellTest(TestCase):
         cell = txc.Cell(stopusage, time, time, None, None)
         self.assertIsNone(cell.wait_time)
 
+    def test_cell_slots(self):
+        """Test Cells have no __dict__, but can still be marked as last"""
+        cell = txc.Cell(None, timedelta(), timedelta(), None, None)
+        self.assertFalse(hasattr(cell, "__dict__"))
+        self.assertFalse(cell.last)
+        cell.last = True
+        self.assertTrue(cell.last)
+
 
 class DeadRunTest(TestCase):
     """Tests for get_deadruns and get_deadrun_ref"""
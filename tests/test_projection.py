@@ -0,0 +1,72 @@
+"""Tests for converting British National Grid coordinates to WGS84"""
+
+import math
+import os
+from array import array
+from unittest import TestCase, skipIf
+
+from txc import projection, txc
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "test_data")
+SAMPLE_FILE = os.path.join(TEST_DATA_DIR, "sample.xml")
+
+
+class ProjectionTest(TestCase):
+    def test_grid_to_osgb36(self):
+        # the Ordnance Survey's worked example (Caister water tower)
+        lon, lat = projection.grid_to_osgb36(651409.903, 313177.270)
+        self.assertAlmostEqual(math.degrees(lat), 52.657570306, places=8)
+        self.assertAlmostEqual(math.degrees(lon), 1.717921583, places=8)
+
+    def test_to_wgs84(self):
+        coordinates = projection.to_wgs84(
+            array("d", [651409.903, 313177.270, 651409.903, 313177.270])
+        )
+        self.assertEqual(len(coordinates), 4)
+        self.assertAlmostEqual(coordinates[0], 1.716052, places=5)
+        self.assertAlmostEqual(coordinates[1], 52.657979, places=5)
+        self.assertEqual(coordinates[:2], coordinates[2:])
+
+        self.assertEqual(projection.to_wgs84(array("d")), array("d"))
+
+    def test_not_finite(self):
+        for easting, northing in (
+            (math.nan, math.nan),
+            (math.inf, 226500),
+            (600500, -math.inf),
+        ):
+            lon, lat = projection.grid_to_osgb36(easting, northing)
+            self.assertTrue(math.isnan(lon))
+            self.assertTrue(math.isnan(lat))
+
+        coordinates = projection.to_wgs84(
+            array("d", [math.nan, 226500, 651409.903, 313177.270])
+        )
+        self.assertTrue(all(map(math.isnan, coordinates[:2])))
+        self.assertAlmostEqual(coordinates[2], 1.716052, places=5)
+
+    def test_wgs84_tracks(self):
+        document = txc.TransXChange(SAMPLE_FILE)
+        links = {
+            link.id: link
+            for section in document.route_sections.values()
+            for link in section.links
+        }
+        tracks = projection.WGS84Tracks(document)
+
+        # already WGS84
+        self.assertIs(tracks.get_coordinates(links["RL2"]), links["RL2"].coordinates)
+        self.assertIsNone(tracks.tracks)
+
+        coordinates = tracks.get_coordinates(links["RL4"])
+        self.assertEqual(coordinates, projection.to_wgs84(links["RL4"].coordinates))
+        self.assertAlmostEqual(coordinates[0], 0.9, places=1)
+        self.assertAlmostEqual(coordinates[1], 51.9, places=1)
+        self.assertIs(tracks.get_coordinates(links["RL4"]), coordinates)
+
+    @skipIf(projection.numpy is None, "NumPy is not installed")
+    def test_not_finite_numpy(self):
+        grid = projection.numpy.array([math.nan, 651409.903])
+        lon, lat = projection.grid_to_osgb36(grid, grid, projection.numpy)
+        self.assertTrue(math.isnan(lat[0]))
+        self.assertFalse(math.isnan(lat[1]))
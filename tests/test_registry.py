@@ -0,0 +1,43 @@
+"""Tests for sharing Stops between documents"""
+
+import os
+import xml.etree.ElementTree as ET
+from unittest import TestCase
+
+from txc import registry, txc
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "test_data")
+SAMPLE_FILE = os.path.join(TEST_DATA_DIR, "sample.xml")
+
+
+class StopRegistryTest(TestCase):
+    def test_stop_registry(self):
+        stop_registry = registry.StopRegistry()
+        first = txc.TransXChange(SAMPLE_FILE, stop_registry=stop_registry)
+        second = txc.TransXChange(
+            SAMPLE_FILE, low_memory=True, stop_registry=stop_registry
+        )
+        self.assertEqual(len(stop_registry), 4)
+
+        stop = first.stops["1500A"]
+        self.assertIs(second.stops["1500A"], stop)
+        self.assertIsNone(stop.element)
+        self.assertEqual(str(stop), "Sampleton Bus Station (Stand A)")
+        self.assertEqual(stop.location.wkt(), "POINT(0.9010 51.8890)")
+
+        # the journey patterns use the shared stops
+        stopusage = next(first.journeys[0].get_times()).stopusage
+        self.assertIs(stopusage.stop, stop)
+
+        # a stop with a different name isn't the same
+        renamed = txc.Stop(
+            ET.fromstring(
+                "<StopPoint><AtcoCode>1500a</AtcoCode>"
+                "<Descriptor><CommonName>Bus Station</CommonName></Descriptor>"
+                "</StopPoint>"
+            )
+        )
+        self.assertEqual(renamed.atco_code, "1500A")
+        self.assertIsNot(stop_registry.get_stop(renamed), stop)
+        self.assertIs(stop_registry.get_stop(renamed), renamed)
+        self.assertEqual(len(stop_registry), 5)
@@ -0,0 +1,114 @@
+"""Tests for route shapes"""
+
+import os
+from array import array
+from types import SimpleNamespace
+from unittest import TestCase, mock
+
+from txc import projection, shapes, txc
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "test_data")
+SAMPLE_FILE = os.path.join(TEST_DATA_DIR, "sample.xml")
+
+
+def get_journey_pattern(route_ref, *route_link_refs):
+    return SimpleNamespace(
+        route_ref=route_ref,
+        get_timinglinks=lambda: [
+            SimpleNamespace(route_link_ref=ref) for ref in route_link_refs
+        ],
+    )
+
+
+class RouteShapesTest(TestCase):
+    def setUp(self):
+        self.document = txc.TransXChange(SAMPLE_FILE)
+        self.shapes = shapes.RouteShapes(self.document)
+
+    def test_route_shape(self):
+        shape = self.shapes.get_route_shape("R1")
+        self.assertIs(self.shapes.get_route_shape("R1"), shape)
+        self.assertIsNone(self.shapes.get_route_shape("R3"))
+
+        self.assertEqual(shape.stops, ["1500A", "1500B", "1500C", "1500D"])
+        self.assertEqual(
+            shape.coordinates,
+            self.document.routes["R1"].get_coordinates(self.document.route_sections)[0],
+        )
+        self.assertEqual(shape.slices, {"RL1": (0, 6), "RL2": (4, 8), "RL3": (6, 10)})
+        self.assertEqual(
+            shape.get_link_coordinates("RL2"), array("d", [0.905, 51.892, 0.91, 51.895])
+        )
+        self.assertEqual(
+            shape.wkt(),
+            "LINESTRING(0.901 51.889, 0.903 51.89, 0.905 51.892, "
+            "0.91 51.895, 0.92 51.9)",
+        )
+
+        shape = self.shapes.get_route_shape("R2")
+        self.assertEqual(shape.stops, ["1500D", "1500E"])
+        self.assertEqual(shape.srid, 27700)
+
+    def test_journey_pattern_shape(self):
+        patterns = {
+            pattern.id: pattern
+            for service in self.document.services.values()
+            for pattern in service.journey_patterns.values()
+        }
+        route_shape = self.shapes.get_route_shape("R1")
+        coordinates, srid = self.shapes.get_journey_pattern_shape(patterns["JP1"])
+        self.assertIs(coordinates, route_shape.coordinates)
+        self.assertIsNone(srid)
+        # JP3 shares JP1's route and links
+        self.assertIs(
+            self.shapes.get_journey_pattern_shape(patterns["JP3"]),
+            self.shapes.get_journey_pattern_shape(patterns["JP1"]),
+        )
+
+        coordinates, srid = self.shapes.get_journey_pattern_shape(patterns["JP2"])
+        self.assertEqual(srid, 27700)
+        self.assertEqual(len(coordinates), 4)
+
+        # a short working, using part of the route
+        coordinates, _ = self.shapes.get_journey_pattern_shape(
+            get_journey_pattern("R1", "RL2", "RL3")
+        )
+        self.assertEqual(coordinates, route_shape.coordinates[4:])
+
+        # links not on the route (or no route) are joined together
+        coordinates, srid = self.shapes.get_journey_pattern_shape(
+            get_journey_pattern(None, "RL1", "RL2")
+        )
+        self.assertEqual(coordinates, route_shape.coordinates[:8])
+        self.assertEqual(
+            self.shapes.get_journey_pattern_shape(get_journey_pattern(None, "RL9")),
+            (array("d"), None),
+        )
+
+        # the same JourneyPattern again doesn't need its timing links
+        pattern = get_journey_pattern("R1", "RL2", "RL3")
+        shape = self.shapes.get_journey_pattern_shape(pattern)
+        pattern.get_timinglinks = mock.Mock()
+        self.assertIs(self.shapes.get_journey_pattern_shape(pattern), shape)
+        pattern.get_timinglinks.assert_not_called()
+
+    def test_mixed_srids(self):
+        """Test joining British National Grid and WGS84 tracks converts them all
+        to WGS84
+        """
+        wgs84_rl4 = projection.to_wgs84(self.shapes.get_link("RL4").coordinates)
+
+        coordinates, srid = self.shapes.get_journey_pattern_shape(
+            get_journey_pattern(None, "RL3", "RL4")
+        )
+        self.assertIsNone(srid)
+        self.assertEqual(
+            coordinates, array("d", [0.91, 51.895, 0.92, 51.9]) + wgs84_rl4
+        )
+
+        route = SimpleNamespace(id="R3", route_section_refs=["RS1", "RS2"])
+        shape = shapes.RouteShape(
+            route, self.document.route_sections, self.shapes.tracks
+        )
+        self.assertIsNone(shape.srid)
+        self.assertEqual(shape.get_link_coordinates("RL4"), wgs84_rl4)
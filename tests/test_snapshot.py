@@ -0,0 +1,145 @@
+"""Tests for the binary snapshot format"""
+
+import datetime
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from txc import calendars, snapshot, txc
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "test_data")
+SAMPLE_FILE = os.path.join(TEST_DATA_DIR, "sample.xml")
+
+
+class SnapshotTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.directory, "sample.snapshot")
+        cls.document = txc.TransXChange(SAMPLE_FILE)
+        with open(cls.path, "wb") as open_file:
+            snapshot.dump([cls.document], open_file)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def test_snapshot(self):
+        with snapshot.Snapshot(self.path) as loaded:
+            self.assertEqual(loaded.services, {"PB0000001:1": [0], "PB0000001:2": [1]})
+            self.assertEqual(loaded.get_services("PB0000002:1"), [])
+
+            (service,) = loaded.get_services("PB0000001:2")
+            self.assertEqual(str(service.operating_period), "2025-09-01 to None")
+            self.assertEqual([line.line_name for line in service.lines], ["2"])
+            self.assertEqual(
+                service.operating_profile.hash,
+                self.document.services["PB0000001:2"].operating_profile.hash,
+            )
+
+            journeys = {journey.code: journey for journey in self.document.journeys}
+            (service,) = loaded.get_services("PB0000001:1")
+            for line, original in zip(
+                service.lines, self.document.services["PB0000001:1"].lines, strict=True
+            ):
+                for field in snapshot.LINE_FIELDS:
+                    self.assertEqual(getattr(line, field), getattr(original, field))
+            self.assertEqual(service.lines[0].colour, "FF0000")
+            self.assertEqual(service.lines[1].font_colour, "FFFFFF")
+
+            self.assertEqual(
+                [journey.code for journey in service.journeys],
+                ["VJ1", "VJ2", "VJ3", "VJ4", "VJ5", "VJ6"],
+            )
+            for journey in service.journeys:
+                original = journeys[journey.code]
+                self.assertEqual(journey.line_ref, original.line_ref)
+                self.assertEqual(journey.departure_time, original.departure_time)
+                self.assertEqual(journey.operator, original.operator)
+                self.assertIsNone(journey.block)
+                self.assertEqual(journey.notes, original.notes)
+                self.assertEqual(
+                    [
+                        (stop.atco_code, *times)
+                        for stop, *times in journey.get_stop_times()
+                    ],
+                    [
+                        (
+                            cell.stopusage.stop.atco_code,
+                            snapshot.get_seconds(cell.arrival_time),
+                            snapshot.get_seconds(cell.departure_time),
+                            cell.activity,
+                        )
+                        for cell in original.get_times()
+                    ],
+                )
+
+            # VJ1 and VJ3 share stop times, and VJ5's dead run means it doesn't
+            self.assertEqual(service.journeys[0].pattern, service.journeys[2].pattern)
+            self.assertEqual(len(loaded.pattern_offsets) - 1, 4)
+
+            (stop, *_), *_ = service.journeys[0].get_stop_times()
+            self.assertEqual(stop.atco_code, "1500A")
+            self.assertEqual(str(stop), str(self.document.stops["1500A"]))
+            self.assertIs(loaded.get_stop(0), stop)
+
+            school_journey = service.journeys[4]
+            calendar = calendars.Calendars(
+                datetime.date(2025, 9, 1), datetime.date(2025, 12, 31)
+            )
+            self.assertEqual(
+                calendar.get_journey_days(school_journey, service),
+                calendar.get_journey_days(
+                    journeys["VJ5"], self.document.services["PB0000001:1"]
+                ),
+            )
+
+    def test_not_a_snapshot(self):
+        with self.assertRaises(ValueError):
+            snapshot.Snapshot(SAMPLE_FILE)
+
+    def test_periodic_day_type(self):
+        with open(SAMPLE_FILE) as open_file:
+            xml = open_file.read().replace(
+                "<Saturday />\n          </DaysOfWeek>\n        </RegularDayType>",
+                "<Saturday />\n          </DaysOfWeek>\n        </RegularDayType>"
+                "<PeriodicDayType><WeekOfMonth><WeekNumber>first</WeekNumber>"
+                "<WeekNumber>third</WeekNumber></WeekOfMonth></PeriodicDayType>",
+            )
+        document = txc.TransXChange(io.StringIO(xml))
+        path = os.path.join(self.directory, "periodic.snapshot")
+        with open(path, "wb") as open_file:
+            snapshot.dump([document], open_file)
+
+        with snapshot.Snapshot(path) as loaded:
+            (service,) = loaded.get_services("PB0000001:2")
+            original = document.services["PB0000001:2"].operating_profile
+            self.assertEqual(service.operating_profile.hash, original.hash)
+            self.assertEqual(
+                service.operating_profile.weeks_of_month, ("first", "third")
+            )
+
+    def test_block_and_notes(self):
+        with open(SAMPLE_FILE) as open_file:
+            xml = open_file.read().replace(
+                "<VehicleJourneyCode>VJ1</VehicleJourneyCode>",
+                "<VehicleJourneyCode>VJ1</VehicleJourneyCode><Operational><Block>"
+                "<BlockNumber>101</BlockNumber></Block></Operational>"
+                "<Note><NoteCode>S</NoteCode><NoteText>Schooldays</NoteText></Note>",
+            )
+        document = txc.TransXChange(io.StringIO(xml))
+        path = os.path.join(self.directory, "notes.snapshot")
+        with open(path, "wb") as open_file:
+            snapshot.dump([document], open_file)
+
+        with snapshot.Snapshot(path) as loaded:
+            (service,) = loaded.get_services("PB0000001:1")
+            journey = service.journeys[0]
+            self.assertEqual(journey.code, "VJ1")
+            self.assertEqual(journey.block.code, "101")
+            self.assertIsNone(journey.block.description)
+            self.assertEqual(journey.notes, {"S": "Schooldays"})
+            self.assertIsNone(service.journeys[1].block)
+            self.assertEqual(service.journeys[1].notes, {})
@@ -0,0 +1,124 @@
+"""Tests for the spatial index of stops and route links"""
+
+import math
+import os
+import random
+import xml.etree.ElementTree as ET
+from types import SimpleNamespace
+from unittest import TestCase
+
+from txc import spatial, txc
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "test_data")
+SAMPLE_FILE = os.path.join(TEST_DATA_DIR, "sample.xml")
+
+
+class SpatialIndexTest(TestCase):
+    def test_search_and_nearest(self):
+        random.seed(1)
+        points = [(random.random(), random.random()) for _ in range(1000)]
+        index = spatial.SpatialIndex(
+            ((x, y, x, y), i) for i, (x, y) in enumerate(points)
+        )
+        self.assertEqual(len(index), 1000)
+        self.assertEqual(index.height, 2)
+
+        # same as a full scan
+        bbox = (0.2, 0.3, 0.35, 0.4)
+        self.assertEqual(
+            sorted(index.search(bbox)),
+            [
+                i
+                for i, (x, y) in enumerate(points)
+                if 0.2 <= x <= 0.35 and 0.3 <= y <= 0.4
+            ],
+        )
+        x_scale = math.cos(math.radians(0.5))
+        distances = sorted(math.hypot((x - 0.5) * x_scale, y - 0.5) for x, y in points)
+        self.assertEqual(
+            [distance for distance, _ in index.nearest(0.5, 0.5, 5)], distances[:5]
+        )
+        self.assertEqual(
+            index.nearest(0.5, 0.5, 5, max_distance=distances[1]),
+            [
+                (distances[0], index.nearest(0.5, 0.5)[0][1]),
+                (distances[1], index.nearest(0.5, 0.5, 2)[1][1]),
+            ],
+        )
+
+    def test_nearest_longitude_scale(self):
+        # at 52°N, 0.008° of longitude is nearer than 0.006° of latitude
+        index = spatial.SpatialIndex(
+            [((1.008, 52, 1.008, 52), "east"), ((1, 52.006, 1, 52.006), "north")]
+        )
+        (distance, value), _ = index.nearest(1, 52, 2)
+        self.assertEqual(value, "east")
+        self.assertAlmostEqual(distance, 0.008 * math.cos(math.radians(52)))
+
+    def test_empty(self):
+        index = spatial.SpatialIndex([])
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.search((0, 0, 1, 1)), [])
+        self.assertEqual(index.nearest(0, 0), [])
+
+
+class DocumentIndexTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.document = txc.TransXChange(SAMPLE_FILE)
+
+    def test_stop_index(self):
+        self.assertEqual(
+            self.document.stops["1500B"].location.wkt(), "POINT(0.9050 51.8920)"
+        )
+
+        index = spatial.get_stop_index([self.document, self.document])
+        self.assertEqual(len(index), 4)
+        self.assertEqual(
+            {stop.atco_code for stop in index.search((0.9, 51.88, 0.906, 51.9))},
+            {"1500A", "1500B"},
+        )
+        ((distance, stop),) = index.nearest(0.93, 51.9)
+        self.assertEqual(stop.atco_code, "1500D")
+        self.assertAlmostEqual(distance, 0.01 * math.cos(math.radians(51.9)))
+
+    def test_stop_point_locations(self):
+        stop_point = txc.Stop(
+            ET.fromstring(
+                "<StopPoint><AtcoCode>1500F</AtcoCode><Place><Location>"
+                "<Translation><Easting>600500</Easting><Northing>226500</Northing>"
+                "</Translation></Location></Place></StopPoint>"
+            )
+        )
+        self.assertEqual(stop_point.location.srid, 27700)
+        no_location = txc.Stop(
+            ET.fromstring(
+                "<StopPoint><AtcoCode>1500G</AtcoCode><Place><Location/></Place>"
+                "</StopPoint>"
+            )
+        )
+        self.assertIsNone(no_location.location)
+
+        document = SimpleNamespace(
+            stops={stop.atco_code: stop for stop in (stop_point, no_location)}
+        )
+        index = spatial.get_stop_index([document])
+        self.assertEqual(len(index), 1)
+        ((distance, stop),) = index.nearest(0.913, 51.901)
+        self.assertIs(stop, stop_point)
+        self.assertLess(distance, 0.001)
+
+    def test_route_link_index(self):
+        index = spatial.get_route_link_index([self.document])
+        self.assertEqual(len(index), 4)
+
+        ((_, (link, service_codes)),) = index.nearest(0.9, 51.889)
+        self.assertEqual(link.id, "RL1")
+        self.assertEqual(service_codes, {"PB0000001:1", "PB0000001:2"})
+
+        # RL4, converted from British National Grid
+        self.assertEqual(
+            spatial.get_services(index, (0.912, 51.9005, 0.913, 51.901)),
+            {"PB0000001:1"},
+        )
+        self.assertEqual(spatial.get_services(index, (1, 52, 2, 53)), set())
@@ -1 +1 @@
-from .txc import TransXChange  # noqa
+from .txc import TransXChange, scan  # noqa
@@ -0,0 +1,117 @@
+"""Parse TransXChange documents in asyncio programs, as their bytes arrive (e.g.
+while they're being downloaded), without blocking the event loop or using a
+thread.
+
+    async with session.get(url) as response:
+        stream = DocumentStream(response.content.iter_chunked(65536))
+        async for obj in stream:
+            ...  # a Service or VehicleJourney
+
+    stream.document  # the TransXChange, with its stops, operators and so on
+"""
+
+import asyncio
+import io
+import xml.etree.ElementTree as ET
+import zipfile
+
+from .txc import TransXChange
+
+
+class DocumentStream:
+    """source is an async iterable of chunks of bytes, or an object with an
+    async read(size) method (like an asyncio.StreamReader). Any other keyword
+    arguments are passed to TransXChange (except stats, which isn't supported).
+
+    Iterate over it to get each Service and VehicleJourney as soon as it's been
+    parsed. As with stream_journeys=True, document.journeys is left empty.
+    """
+
+    def __init__(self, source, chunk_size=65536, **kwargs):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.pull_parser = ET.XMLPullParser(("start", "end"))
+        self.document = TransXChange(self.pull_parser, stream_journeys=True, **kwargs)
+
+    async def iter_chunks(self):
+        if hasattr(self.source, "read"):
+            while True:
+                chunk = await self.source.read(self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        else:
+            async for chunk in self.source:
+                yield chunk
+
+    def __aiter__(self):
+        return self.iter_objects()
+
+    def get_new_services(self, count) -> list:
+        """Services parsed since the first count"""
+        if len(self.document.services) > count:
+            return list(self.document.services.values())[count:]
+        return []
+
+    async def iter_objects(self):
+        chunks = self.iter_chunks()
+        services = 0  # how many have been yielded
+        finished = False
+        parser = self.document.iter_journeys()
+        try:
+            for journey in parser:
+                if journey is not None:
+                    yield journey
+                    continue
+
+                # parsed everything fed so far
+                for service in self.get_new_services(services):
+                    services += 1
+                    yield service
+                if finished:
+                    break
+                try:
+                    self.pull_parser.feed(await chunks.__anext__())
+                except StopAsyncIteration:
+                    self.pull_parser.close()
+                    finished = True
+
+            # in case parsing stopped early, after the last of some sections
+            for service in self.get_new_services(services):
+                yield service
+        finally:
+            parser.close()
+            await chunks.aclose()
+
+
+async def iter_member_chunks(archive, name, chunk_size):
+    """Read a file in a zip archive in chunks, letting other tasks run in between
+    (it's all in memory, or a local file, so is quick to read)
+    """
+    with archive.open(name) as open_file:
+        while True:
+            chunk = open_file.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+            await asyncio.sleep(0)
+
+
+async def iter_zip(open_file, chunk_size=65536, **kwargs):
+    """Yield a (name, DocumentStream) for each document in a zip archive
+    (including zips within the zip), like bulk.load().
+
+    open_file is a path or a file object - the whole archive must have been
+    downloaded first, because a zip's table of contents is at the end.
+    Each DocumentStream should be iterated over before getting the next one.
+    """
+    with zipfile.ZipFile(open_file) as archive:
+        for name in archive.namelist():
+            lower_name = name.lower()
+            if lower_name.endswith(".xml"):
+                source = iter_member_chunks(archive, name, chunk_size)
+                yield name, DocumentStream(source, chunk_size, **kwargs)
+            elif lower_name.endswith(".zip"):
+                inner = io.BytesIO(archive.read(name))
+                async for inner_name, stream in iter_zip(inner, chunk_size, **kwargs):
+                    yield f"{name}/{inner_name}", stream
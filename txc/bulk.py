@@ -0,0 +1,134 @@
+"""Parse all the TransXChange documents in a zip archive or directory, in parallel"""
+
+import concurrent.futures
+import os
+import sys
+import threading
+import zipfile
+from collections import deque
+
+from .txc import TransXChange
+
+local = threading.local()
+
+
+def is_free_threaded() -> bool:
+    """Whether this is a free-threaded (no GIL) build of Python, like 3.13t"""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def get_names(path) -> list:
+    """Find the documents in a zip archive (including zips within the zip) or
+    directory, in a stable order.
+
+    Each name is a tuple of path components, like ("foo.zip", "bar.xml")
+    for a document in a zip within a zip.
+    """
+    if os.path.isdir(path):
+        names = []
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                if filename.lower().endswith(".xml"):
+                    filename = os.path.join(dirpath, filename)
+                    names.append((os.path.relpath(filename, path),))
+        names.sort()
+        return names
+
+    names = []
+    with zipfile.ZipFile(path) as archive:
+        for name in archive.namelist():
+            lower_name = name.lower()
+            if lower_name.endswith(".xml"):
+                names.append((name,))
+            elif lower_name.endswith(".zip"):
+                with zipfile.ZipFile(archive.open(name)) as inner:
+                    names += [
+                        (name, inner_name)
+                        for inner_name in inner.namelist()
+                        if inner_name.lower().endswith(".xml")
+                    ]
+    return names
+
+
+def open_archive(path):
+    """Open a zip archive once per thread (or process), and keep it open"""
+    archives = getattr(local, "archives", None)
+    if archives is None:
+        archives = local.archives = {}
+    archive = archives.get(path)
+    if archive is None:
+        archive = archives[path] = zipfile.ZipFile(path)
+    return archive
+
+
+def open_inner_archive(path, name):
+    """Open a zip within a zip, keeping only the most recently used one open"""
+    inner = getattr(local, "inner", None)
+    if inner is None or inner[0] != (path, name):
+        if inner is not None:
+            inner[1].close()
+        archive = zipfile.ZipFile(open_archive(path).open(name))
+        inner = local.inner = ((path, name), archive)
+    return inner[1]
+
+
+def parse(path, name, kwargs):
+    if os.path.isdir(path):
+        with open(os.path.join(path, name[0]), "rb") as open_file:
+            return TransXChange(open_file, **kwargs)
+
+    archive = open_archive(path)
+    if len(name) == 2:
+        archive = open_inner_archive(path, name[0])
+    with archive.open(name[-1]) as open_file:
+        return TransXChange(open_file, **kwargs)
+
+
+def get_result(name, future) -> tuple:
+    try:
+        return "/".join(name), future.result()
+    except Exception as e:
+        return "/".join(name), e
+
+
+def load(path, workers=None, threads=None, in_flight=None, **kwargs):
+    """Parse every document in a zip archive or directory, using a pool of
+    processes (or threads, on free-threaded builds of Python).
+
+    Yields (name, TransXChange) tuples in the same order as get_names(path),
+    with at most in_flight documents parsed ahead of the consumer. If a
+    document can't be parsed, the exception is yielded instead of a
+    TransXChange, and the rest are still parsed.
+    Any other keyword arguments are passed to TransXChange - a stop_registry
+    can only be shared between threads, so means threads are used.
+    """
+    if kwargs.get("stop_registry") is not None:
+        if threads is False:
+            raise ValueError("A stop_registry can't be shared between processes")
+        threads = True
+    if threads is None:
+        threads = is_free_threaded()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if in_flight is None:
+        in_flight = workers * 2
+
+    if threads:
+        executor = concurrent.futures.ThreadPoolExecutor(workers)
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(workers)
+
+    names = iter(get_names(path))
+    futures = deque()
+    try:
+        for name in names:
+            futures.append((name, executor.submit(parse, path, name, kwargs)))
+            if len(futures) >= in_flight:
+                yield get_result(*futures.popleft())
+        while futures:
+            yield get_result(*futures.popleft())
+    finally:
+        for _, future in futures:
+            future.cancel()
+        executor.shutdown()
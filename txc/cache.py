@@ -0,0 +1,119 @@
+"""Keep parsed TransXChange documents in an SQLite database, so that loading an
+unchanged file again doesn't involve parsing any XML.
+
+Documents are keyed by a hash of the file's contents (and the TransXChange
+keyword arguments), and stored pickled and compressed. When the cache grows
+beyond max_size bytes, the least recently used documents are removed.
+"""
+
+import hashlib
+import io
+import os
+import pickle
+import sqlite3
+import time
+import zlib
+
+from .txc import TransXChange
+
+# change this when the classes in txc.py change, so old documents are ignored
+VERSION = 7
+
+
+class DocumentCache:
+    def __init__(self, path, max_size=1024 * 1024 * 1024):
+        self.max_size = max_size
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS documents (
+                key TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )""")
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS documents_last_used ON documents (last_used)"
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def get_key(data: bytes, kwargs: dict) -> str:
+        key = hashlib.sha256(data)
+        key.update(f"\n{VERSION}".encode())
+        for name, value in sorted(kwargs.items()):
+            if isinstance(value, (set, frozenset, list, tuple)):
+                value = sorted(value)  # sets' order varies between processes
+            key.update(f"\n{name}={value!r}".encode())
+        return key.hexdigest()
+
+    def load(self, open_file, **kwargs) -> TransXChange:
+        """Get a TransXChange from the cache, or parse (and cache) it.
+
+        open_file is a path or a file opened in binary mode, and any keyword
+        arguments are passed to TransXChange (except stream_journeys,
+        stop_registry and stats, which aren't supported).
+        """
+        if kwargs.get("stream_journeys"):
+            raise ValueError("Can't cache a document with stream_journeys")
+        if kwargs.get("stop_registry") is not None:
+            raise ValueError("Can't cache a document with a stop_registry")
+        if kwargs.get("stats") is not None:
+            raise ValueError("Can't record stats for a cached document")
+
+        if isinstance(open_file, (str, os.PathLike)):
+            with open(open_file, "rb") as f:
+                data = f.read()
+        else:
+            data = open_file.read()
+        key = self.get_key(data, kwargs)
+
+        row = self.connection.execute(
+            "SELECT data FROM documents WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None:
+            self.connection.execute(
+                "UPDATE documents SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self.connection.commit()
+            return pickle.loads(zlib.decompress(row[0]))
+
+        document = TransXChange(io.BytesIO(data), **kwargs)
+        self.add(key, document)
+        return document
+
+    def add(self, key, document):
+        data = zlib.compress(pickle.dumps(document, pickle.HIGHEST_PROTOCOL), 1)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)",
+            (key, data, len(data), time.time()),
+        )
+        self.evict()
+        self.connection.commit()
+
+    def evict(self):
+        """Remove the least recently used documents until the total size is
+        within max_size
+        """
+        (total,) = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM documents"
+        ).fetchone()
+        if total <= self.max_size:
+            return
+        rows = self.connection.execute(
+            "SELECT key, size FROM documents ORDER BY last_used"
+        ).fetchall()
+        keys = []
+        for key, size in rows:
+            if total <= self.max_size:
+                break
+            keys.append((key,))
+            total -= size
+        self.connection.executemany("DELETE FROM documents WHERE key = ?", keys)
@@ -0,0 +1,205 @@
+"""Work out which dates journeys run on.
+
+An OperatingProfile (plus the Service's OperatingPeriod) is compiled into a
+bitset over a window of dates - a Python int where bit i is set if the journey
+runs on start + i days - so combining regular days, special days, serviced
+organisations and bank holidays is a handful of integer operations, done once
+per distinct OperatingProfile.
+"""
+
+import datetime
+
+# Bank holiday elements that stand for several others
+BANK_HOLIDAY_GROUPS = {
+    "Christmas": ("ChristmasDay", "BoxingDay"),
+    "DisplacementHolidays": (
+        "ChristmasDayHoliday",
+        "BoxingDayHoliday",
+        "NewYearsDayHoliday",
+        "Jan2ndScotlandHoliday",
+        "StAndrewsDayHoliday",
+    ),
+    "EarlyRunOff": ("ChristmasEve", "NewYearsEve"),
+    "HolidayMondays": (
+        "EasterMonday",
+        "MayDay",
+        "SpringBank",
+        "LateSummerBankHolidayNotScotland",
+        "AugustBankHolidayScotland",
+    ),
+}
+BANK_HOLIDAY_GROUPS["AllHolidaysExceptChristmas"] = (
+    "NewYearsDay",
+    "Jan2ndScotland",
+    "GoodFriday",
+    "StAndrewsDay",
+    "NewYearsDayHoliday",
+    "Jan2ndScotlandHoliday",
+    "StAndrewsDayHoliday",
+    *BANK_HOLIDAY_GROUPS["HolidayMondays"],
+)
+BANK_HOLIDAY_GROUPS["AllBankHolidays"] = (
+    "ChristmasDay",
+    "BoxingDay",
+    "ChristmasDayHoliday",
+    "BoxingDayHoliday",
+    *BANK_HOLIDAY_GROUPS["AllHolidaysExceptChristmas"],
+)
+# <RegularDayType><HolidaysOnly /></RegularDayType>
+BANK_HOLIDAY_GROUPS["HolidaysOnly"] = BANK_HOLIDAY_GROUPS["AllBankHolidays"]
+
+WEEK_NUMBERS = {"first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5}
+
+
+class Calendars:
+    """Evaluates OperatingProfiles over the dates from start to end (inclusive).
+
+    bank_holidays is a dict like {"ChristmasDay": [datetime.date(2025, 12, 25)]},
+    with TransXChange bank holiday element names as keys.
+    """
+
+    def __init__(self, start, end, bank_holidays=None):
+        self.start = start
+        self.end = end
+        self.length = (end - start).days + 1
+        self.all_days = (1 << self.length) - 1
+
+        # a mask for each day of the week, Monday (0) to Sunday (6)
+        self.weekdays = [0] * 7
+        for i in range(min(7, self.length)):
+            day = (start.weekday() + i) % 7
+            mask = 0
+            for j in range(i, self.length, 7):
+                mask |= 1 << j
+            self.weekdays[day] = mask
+
+        self.bank_holidays = {}
+        if bank_holidays:
+            for name, dates in bank_holidays.items():
+                self.bank_holidays[name] = self.get_dates_mask(dates)
+
+        self.cache = {}
+
+    def get_index(self, date) -> int:
+        return (date - self.start).days
+
+    def get_range_mask(self, start, end) -> int:
+        """Days from start to end (either of which may be None, meaning open-ended)"""
+        first = 0 if not start else max(self.get_index(start), 0)
+        last = self.length - 1 if not end else min(self.get_index(end), self.length - 1)
+        if last < first:
+            return 0
+        return ((1 << (last - first + 1)) - 1) << first
+
+    def get_date_ranges_mask(self, date_ranges) -> int:
+        mask = 0
+        for date_range in date_ranges:
+            mask |= self.get_range_mask(date_range.start, date_range.end)
+        return mask
+
+    def get_dates_mask(self, dates) -> int:
+        mask = 0
+        for date in dates:
+            index = self.get_index(date)
+            if 0 <= index < self.length:
+                mask |= 1 << index
+        return mask
+
+    def get_bank_holidays_mask(self, bank_holidays) -> int:
+        mask = 0
+        for bank_holiday in bank_holidays:
+            if isinstance(bank_holiday, datetime.date):
+                mask |= self.get_dates_mask((bank_holiday,))
+            else:
+                for name in BANK_HOLIDAY_GROUPS.get(bank_holiday, (bank_holiday,)):
+                    mask |= self.bank_holidays.get(name, 0)
+        return mask
+
+    def get_week_of_month_mask(self, week_of_month) -> int:
+        week_number = WEEK_NUMBERS.get(week_of_month)
+        if week_number is None and week_of_month != "last":
+            return self.all_days
+        mask = 0
+        date = self.start
+        for i in range(self.length):
+            if week_number is None:
+                next_week = date + datetime.timedelta(days=7)
+                if next_week.month != date.month:
+                    mask |= 1 << i
+            elif (date.day - 1) // 7 + 1 == week_number:
+                mask |= 1 << i
+            date += datetime.timedelta(days=1)
+        return mask
+
+    def get_days(self, operating_profile, operating_period=None) -> int:
+        """Get a bitset of the days an OperatingProfile applies to"""
+        if operating_period is None:
+            key = (operating_profile.hash, None, None)
+        else:
+            key = (operating_profile.hash, operating_period.start, operating_period.end)
+        days = self.cache.get(key)
+        if days is None:
+            days = self.cache[key] = self.compile(operating_profile, operating_period)
+        return days
+
+    def compile(self, operating_profile, operating_period) -> int:
+        days = 0
+        for day in operating_profile.regular_days:
+            days |= self.weekdays[day.day]
+
+        if operating_profile.weeks_of_month:
+            weeks = 0
+            for week_of_month in operating_profile.weeks_of_month:
+                weeks |= self.get_week_of_month_mask(week_of_month)
+            days &= weeks
+
+        # serviced organisations (schools, etc)
+        operation = None
+        nonoperation = 0
+        for day_type in operating_profile.serviced_organisations:
+            organisation = day_type.serviced_organisation
+            if day_type.working:
+                mask = self.get_date_ranges_mask(organisation.working_days)
+            else:
+                mask = self.get_date_ranges_mask(organisation.holidays)
+            if day_type.operation:
+                operation = (operation or 0) | mask
+            else:
+                nonoperation |= mask
+        if operation is not None:
+            days &= operation
+        days &= ~nonoperation
+
+        # bank holidays
+        days |= self.get_bank_holidays_mask(
+            operating_profile.operation_bank_holiday_names
+        )
+        days &= ~self.get_bank_holidays_mask(
+            operating_profile.nonoperation_bank_holiday_names
+        )
+
+        # special days
+        days |= self.get_date_ranges_mask(operating_profile.operation_days)
+        days &= ~self.get_date_ranges_mask(operating_profile.nonoperation_days)
+
+        if operating_period is not None:
+            days &= self.get_range_mask(operating_period.start, operating_period.end)
+        return days & self.all_days
+
+    def get_journey_days(self, journey, service) -> int:
+        """Get a bitset of the days a VehicleJourney runs on"""
+        operating_profile = journey.operating_profile or service.operating_profile
+        if operating_profile is None:
+            return 0
+        return self.get_days(operating_profile, service.operating_period)
+
+    def runs_on(self, days, date) -> bool:
+        index = self.get_index(date)
+        return 0 <= index < self.length and bool(days >> index & 1)
+
+    def get_dates(self, days) -> list:
+        return [
+            self.start + datetime.timedelta(days=index)
+            for index, bit in enumerate(reversed(bin(days)[2:]))
+            if bit == "1"
+        ]
@@ -0,0 +1,163 @@
+"""Export the stop times of every journey in a document as columns of integers,
+rather than a Cell object per stop per journey.
+
+Uses the array module, so has no dependencies, but if NumPy is installed
+StopTimes.to_numpy() returns NumPy arrays sharing the same memory.
+"""
+
+import datetime
+from array import array
+from itertools import repeat
+from operator import add
+
+from .txc import get_stop_times
+
+try:
+    import numpy
+except ImportError:  # e.g. in Pyodide without NumPy loaded
+    numpy = None
+
+
+def get_seconds(timedelta) -> int:
+    return timedelta.days * 86400 + timedelta.seconds
+
+
+class StopTimes:
+    """Columns with one row per stop per journey, in journey order.
+
+    journey, stop and activity are indexes into the journeys, stops and
+    activities lists. sequence counts from 0 within each journey.
+    arrival and departure are seconds since midnight (maybe over 86400).
+    """
+
+    columns = ("journey", "stop", "sequence", "arrival", "departure", "activity")
+
+    def __init__(self):
+        self.journeys = []  # VehicleJourneys
+        self.stops = []  # Stops
+        self.activities = [None]  # like "pickUp" or "setDown"
+
+        self.journey = array("i")
+        self.stop = array("i")
+        self.sequence = array("i")
+        self.arrival = array("i")
+        self.departure = array("i")
+        self.activity = array("b")
+
+    def __len__(self):
+        return len(self.journey)
+
+    def to_numpy(self) -> dict:
+        """A dict of NumPy arrays (without copying), or ImportError"""
+        if numpy is None:
+            raise ImportError("NumPy is not installed")
+        return {
+            column: numpy.frombuffer(
+                getattr(self, column), dtype=getattr(self, column).typecode
+            )
+            for column in self.columns
+        }
+
+
+def get_stop_time_columns(document) -> StopTimes:
+    """Get the stop times of all the journeys in a TransXChange document"""
+    stop_times = StopTimes()
+
+    stop_indexes = {}  # {atco_code: index}
+    activity_indexes = {None: 0}  # {activity: index}
+
+    def get_template(rows) -> tuple:
+        """Convert (stopusage, arrival, departure, activity, notes) tuples to
+        (stops, sequence, arrivals, waits, activities) columns, where waits is
+        a list of (row, seconds) for the rows where departure isn't arrival
+        """
+        stops = array("i")
+        arrivals = array("i")
+        waits = []
+        activities = array("b")
+        for i, (stopusage, arrival, departure, activity, _) in enumerate(rows):
+            stop = stopusage.stop
+            stop_index = stop_indexes.get(stop.atco_code)
+            if stop_index is None:
+                stop_index = stop_indexes[stop.atco_code] = len(stop_times.stops)
+                stop_times.stops.append(stop)
+            stops.append(stop_index)
+
+            activity_index = activity_indexes.get(activity)
+            if activity_index is None:
+                activity_index = activity_indexes[activity] = len(stop_times.activities)
+                stop_times.activities.append(activity)
+            activities.append(activity_index)
+
+            arrivals.append(get_seconds(arrival))
+            if departure != arrival:
+                waits.append((i, get_seconds(departure - arrival)))
+        return stops, array("i", range(len(stops))), arrivals, waits, activities
+
+    # {JourneyPattern id(): template}, or for journeys with their own timing
+    # links or dead runs, {(JourneyPattern id(), ...): template}
+    templates = {}
+
+    # the columns are built by appending a whole template's arrays at a time,
+    # so the only per-row work is adding the departure time to the arrivals
+    journey_column = stop_times.journey
+    stop_column = stop_times.stop
+    sequence_column = stop_times.sequence
+    arrival_column = stop_times.arrival
+    departure_column = stop_times.departure
+    activity_column = stop_times.activity
+
+    for journey_index, journey in enumerate(document.journeys):
+        stop_times.journeys.append(journey)
+
+        if (
+            journey.timing_links
+            or journey.start_deadrun is not None
+            or journey.end_deadrun is not None
+        ):
+            key = (
+                id(journey.journey_pattern),
+                journey.start_deadrun,
+                journey.end_deadrun,
+                tuple(
+                    (
+                        link.journeypatterntiminglinkref,
+                        link.run_time,
+                        link.from_wait_time,
+                        link.to_wait_time,
+                        link.from_activity,
+                        link.to_activity,
+                    )
+                    for link in journey.timing_links
+                ),
+            )
+            template = templates.get(key)
+            if template is None:
+                rows = get_stop_times(
+                    journey.get_timinglinks(),
+                    datetime.timedelta(),
+                    journey.start_deadrun,
+                    journey.end_deadrun,
+                )
+                template = templates[key] = get_template(rows)
+        else:
+            key = id(journey.journey_pattern)
+            template = templates.get(key)
+            if template is None:
+                rows = journey.journey_pattern.get_template()
+                template = templates[key] = get_template(rows)
+
+        stops, sequence, arrivals, waits, activities = template
+        count = len(stops)
+        start = len(arrival_column)
+        journey_column.extend(array("i", (journey_index,)) * count)
+        stop_column.extend(stops)
+        sequence_column.extend(sequence)
+        activity_column.extend(activities)
+        departure_time = get_seconds(journey.departure_time)
+        arrival_column.extend(map(add, arrivals, repeat(departure_time, count)))
+        departure_column.extend(arrival_column[start:])
+        for i, wait in waits:
+            departure_column[start + i] += wait
+
+    return stop_times
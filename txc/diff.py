@@ -0,0 +1,217 @@
+"""Compare two revisions of a TransXChange document, to find which stops,
+journey patterns, services and journeys have been added, removed or changed -
+so that a database can be updated with just the differences.
+
+A journey's fingerprint includes its JourneyPattern's, which includes its
+JourneyPatternSections', so a journey counts as changed if anything that
+affects its stop times or operating days has changed.
+"""
+
+import hashlib
+
+SECTIONS = (
+    "stops",
+    "journey_pattern_sections",
+    "journey_patterns",
+    "services",
+    "journeys",
+)
+
+
+def get_digest(value) -> str:
+    return hashlib.blake2b(repr(value).encode(), digest_size=16).hexdigest()
+
+
+def get_location_fingerprint(location):
+    if location is not None:
+        return (location.longitude, location.latitude, location.srid)
+
+
+def get_profile_hash(operating_profile):
+    if operating_profile is not None:
+        return operating_profile.hash
+
+
+def get_stop_usage_fingerprint(stopusage) -> tuple:
+    return (
+        stopusage.stop.atco_code,
+        stopusage.sequencenumber,
+        stopusage.activity,
+        stopusage.dynamic_destination_display,
+        stopusage.timingstatus,
+        stopusage.wait_time,
+        stopusage.notes,
+    )
+
+
+def get_timing_link_fingerprint(link) -> tuple:
+    return (
+        link.id,
+        get_stop_usage_fingerprint(link.origin),
+        get_stop_usage_fingerprint(link.destination),
+        link.runtime,
+        link.route_link_ref,
+    )
+
+
+def get_journey_timing_link_fingerprint(link) -> tuple:
+    return (
+        link.journeypatterntiminglinkref,
+        link.run_time,
+        link.from_wait_time,
+        link.to_wait_time,
+        link.from_activity,
+        link.to_activity,
+    )
+
+
+def get_line_fingerprint(line) -> tuple:
+    return (
+        line.id,
+        line.line_name,
+        line.line_brand,
+        line.marketing_name,
+        line.colour,
+        line.outbound_description,
+        line.inbound_description,
+    )
+
+
+class Fingerprints:
+    """Digests of the parts of a document, keyed by ATCO code, id or code.
+
+    Journey patterns are keyed by (service code, id), as ids only need to be
+    unique within a Service.
+    """
+
+    def __init__(self, document):
+        self.stops = {
+            atco_code: get_digest(
+                (
+                    stop.atco_code,
+                    stop.common_name,
+                    stop.indicator,
+                    stop.locality,
+                    get_location_fingerprint(stop.location),
+                )
+            )
+            for atco_code, stop in document.stops.items()
+        }
+
+        self.journey_pattern_sections = {
+            section_id: get_digest(
+                tuple(get_timing_link_fingerprint(link) for link in section.timinglinks)
+            )
+            for section_id, section in document.journey_pattern_sections.items()
+        }
+
+        self.journey_patterns = {}
+        self.services = {}
+        patterns = {}  # {JourneyPattern id(): digest}
+        for service_code, service in document.services.items():
+            for pattern_id, pattern in service.journey_patterns.items():
+                digest = get_digest(
+                    (
+                        tuple(
+                            (section.id, self.journey_pattern_sections.get(section.id))
+                            for section in pattern.sections
+                        ),
+                        pattern.route_ref,
+                        pattern.direction,
+                        get_profile_hash(pattern.operating_profile),
+                    )
+                )
+                self.journey_patterns[(service_code, pattern_id)] = digest
+                patterns[id(pattern)] = digest
+
+            self.services[service_code] = get_digest(
+                (
+                    service.mode,
+                    service.operator,
+                    service.operating_period.start,
+                    service.operating_period.end,
+                    get_profile_hash(service.operating_profile),
+                    service.public_use,
+                    service.marketing_name,
+                    service.description,
+                    service.origin,
+                    service.destination,
+                    service.vias,
+                    tuple(get_line_fingerprint(line) for line in service.lines),
+                    service.ticket_machine_service_code,
+                    service.commercial_basis,
+                )
+            )
+
+        self.journeys = {
+            journey.code: get_digest(
+                (
+                    journey.service_ref,
+                    journey.line_ref,
+                    journey.journey_pattern.id,
+                    patterns.get(id(journey.journey_pattern)),
+                    journey.departure_time,
+                    get_profile_hash(journey.operating_profile),
+                    tuple(
+                        get_journey_timing_link_fingerprint(link)
+                        for link in journey.timing_links
+                    ),
+                    journey.start_deadrun,
+                    journey.end_deadrun,
+                    journey.private_code,
+                    journey.ticket_machine_journey_code,
+                    journey.ticket_machine_service_code,
+                    journey.block and journey.block.code,
+                    journey.vehicle_type and journey.vehicle_type.code,
+                    journey.garage_ref,
+                    journey.operator,
+                    journey.sequencenumber,
+                    sorted(journey.notes.items()),
+                    journey.frequency_interval,
+                    getattr(journey, "frequency_end_time", None),
+                )
+            )
+            for journey in document.journeys
+        }
+
+
+class Changes:
+    """Keys (like ATCO codes or VehicleJourneyCodes) that have been added,
+    removed or changed, in document order
+    """
+
+    def __init__(self, old: dict, new: dict):
+        self.added = [key for key in new if key not in old]
+        self.removed = [key for key in old if key not in new]
+        self.changed = [
+            key for key, digest in new.items() if key in old and old[key] != digest
+        ]
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return (
+            f"<Changes added={self.added} removed={self.removed} "
+            f"changed={self.changed}>"
+        )
+
+
+class Diff:
+    def __init__(self, old: Fingerprints, new: Fingerprints):
+        for name in SECTIONS:
+            setattr(self, name, Changes(getattr(old, name), getattr(new, name)))
+
+    def __bool__(self):
+        return any(getattr(self, name) for name in SECTIONS)
+
+
+def diff(old, new) -> Diff:
+    """Compare two TransXChange documents. Either can instead be the Fingerprints
+    of a document, so the whole of the old document needn't be kept around
+    """
+    if not isinstance(old, Fingerprints):
+        old = Fingerprints(old)
+    if not isinstance(new, Fingerprints):
+        new = Fingerprints(new)
+    return Diff(old, new)
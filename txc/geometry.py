@@ -0,0 +1,74 @@
+"""Encode lines stored as flat arrays of coordinates, like
+array("d", [x0, y0, x1, y1, ...]), as WKT, WKB or GeoJSON.
+
+x and y are longitude and latitude, or easting and northing if the srid is
+27700 (British National Grid).
+"""
+
+import struct
+import sys
+from array import array
+
+WKB_LINESTRING = 2
+EWKB_SRID_FLAG = 0x20000000
+
+
+def get_points(coordinates):
+    """Yield (x, y) tuples"""
+    return zip(coordinates[::2], coordinates[1::2])
+
+
+def wkt(coordinates, srid=None) -> str:
+    """A LINESTRING, in extended WKT (with an SRID) if srid is given"""
+    points = ", ".join(f"{x} {y}" for x, y in get_points(coordinates))
+    if srid:
+        return f"SRID={srid};LINESTRING({points})"
+    return f"LINESTRING({points})"
+
+
+def wkb(coordinates, srid=None) -> bytes:
+    """A LINESTRING, in little-endian extended WKB (with an SRID) if srid is
+    given
+    """
+    if sys.byteorder != "little":
+        coordinates = array("d", coordinates)
+        coordinates.byteswap()
+    if srid:
+        header = struct.pack(
+            "<BIII", 1, WKB_LINESTRING | EWKB_SRID_FLAG, srid, len(coordinates) // 2
+        )
+    else:
+        header = struct.pack("<BII", 1, WKB_LINESTRING, len(coordinates) // 2)
+    return header + coordinates.tobytes()
+
+
+def geojson(coordinates) -> dict:
+    """A GeoJSON LineString geometry (which should be in WGS84)"""
+    return {
+        "type": "LineString",
+        "coordinates": [[x, y] for x, y in get_points(coordinates)],
+    }
+
+
+def merge(lines) -> array:
+    """Join lines end to end into one, leaving out the first point of each line
+    that's the same as the last point of the one before
+    """
+    return merge_with_offsets(lines)[0]
+
+
+def merge_with_offsets(lines) -> tuple:
+    """Like merge(), but also return a (start, end) tuple for each line, the
+    slice of the merged coordinates it takes up (including any shared point)
+    """
+    merged = array("d")
+    offsets = []
+    for coordinates in lines:
+        if merged and coordinates[:2] == merged[-2:]:
+            start = len(merged) - 2
+            merged += coordinates[2:]
+        else:
+            start = len(merged)
+            merged += coordinates
+        offsets.append((start, len(merged)))
+    return merged, offsets
@@ -0,0 +1,213 @@
+"""Convert British National Grid eastings and northings (SRID 27700) to WGS84
+longitudes and latitudes, without PostGIS.
+
+Works on flat arrays of coordinates like array("d", [x0, y0, x1, y1, ...]) (see
+geometry.py), a whole batch at a time - using NumPy if it's installed, or plain
+Python if not (e.g. in Pyodide without NumPy loaded).
+
+The grid is converted to OSGB36 latitude and longitude with the Ordnance
+Survey's inverse Transverse Mercator formulas, then to WGS84 with a 7-parameter
+Helmert transformation, which is accurate to about 5 metres (good enough for
+drawing a map, but not as accurate as OSTN15).
+"""
+
+import math
+from array import array
+
+try:
+    import numpy
+except ImportError:  # e.g. in Pyodide without NumPy loaded
+    numpy = None
+
+# Airy 1830 ellipsoid and the National Grid's true origin
+AIRY_A = 6377563.396
+AIRY_B = 6356256.909
+F0 = 0.9996012717
+LAT0 = math.radians(49)
+LON0 = math.radians(-2)
+N0 = -100000
+E0 = 400000
+
+# GRS80 (WGS84) ellipsoid
+WGS84_A = 6378137
+WGS84_B = 6356752.314140
+
+# Helmert transformation from OSGB36 to WGS84 (the OS's WGS84 to OSGB36
+# parameters with the signs flipped): translations in metres, scale in ppm,
+# rotations in seconds of arc
+TX, TY, TZ = 446.448, -125.157, 542.060
+S = -20.4894
+RX, RY, RZ = 0.1502, 0.2470, 0.8421
+
+AIRY_E2 = 1 - (AIRY_B * AIRY_B) / (AIRY_A * AIRY_A)
+WGS84_E2 = 1 - (WGS84_B * WGS84_B) / (WGS84_A * WGS84_A)
+
+
+# of the latitude, in grid_to_osgb36
+MAX_ITERATIONS = 20
+
+# coefficients of the meridional arc series
+N = (AIRY_A - AIRY_B) / (AIRY_A + AIRY_B)
+M1 = AIRY_B * F0 * (1 + N + 5 / 4 * N**2 + 5 / 4 * N**3)
+M2 = AIRY_B * F0 * (3 * N + 3 * N**2 + 21 / 8 * N**3)
+M3 = AIRY_B * F0 * (15 / 8 * N**2 + 15 / 8 * N**3)
+M4 = AIRY_B * F0 * 35 / 24 * N**3
+
+
+def get_meridional_arc(lat, m):
+    """The distance north from the true origin to a latitude (in radians)"""
+    dlat = lat - LAT0
+    slat = lat + LAT0
+    return (
+        M1 * dlat
+        - M2 * m.sin(dlat) * m.cos(slat)
+        + M3 * m.sin(2 * dlat) * m.cos(2 * slat)
+        - M4 * m.sin(3 * dlat) * m.cos(3 * slat)
+    )
+
+
+def grid_to_osgb36(easting, northing, m=math):
+    """Convert eastings and northings to OSGB36 (lon, lat) in radians.
+
+    m is the math module for single numbers, or numpy for arrays. Coordinates
+    that aren't finite (like NaN) come out as NaN.
+    """
+    if m is math and not (math.isfinite(easting) and math.isfinite(northing)):
+        return math.nan, math.nan
+
+    a_f0 = AIRY_A * F0
+    e2 = AIRY_E2
+
+    lat = (northing - N0) / a_f0 + LAT0
+    # this converges in a few iterations, but an array with NaN or infinity in it
+    # never would (the other values just get a little more accurate)
+    for _ in range(MAX_ITERATIONS):
+        error = northing - N0 - get_meridional_arc(lat, m)
+        if (m.fabs(error) if m is math else m.abs(error).max()) < 0.00001:
+            break
+        lat = lat + error / a_f0
+
+    sin_lat = m.sin(lat)
+    sec_lat = 1 / m.cos(lat)
+    tan = m.tan(lat)
+    tan2 = tan * tan
+    tan4 = tan2 * tan2
+    nu = a_f0 / m.sqrt(1 - e2 * sin_lat * sin_lat)
+    rho = a_f0 * (1 - e2) / (1 - e2 * sin_lat * sin_lat) ** 1.5
+    eta2 = nu / rho - 1
+    nu3 = nu * nu * nu
+    nu5 = nu3 * nu * nu
+
+    vii = tan / (2 * rho * nu)
+    viii = tan / (24 * rho * nu3) * (5 + 3 * tan2 + eta2 - 9 * tan2 * eta2)
+    ix = tan / (720 * rho * nu5) * (61 + 90 * tan2 + 45 * tan4)
+    x = sec_lat / nu
+    xi = sec_lat / (6 * nu3) * (nu / rho + 2 * tan2)
+    xii = sec_lat / (120 * nu5) * (5 + 28 * tan2 + 24 * tan4)
+    xiia = (
+        sec_lat
+        / (5040 * nu5 * nu * nu)
+        * (61 + 662 * tan2 + 1320 * tan4 + 720 * tan4 * tan2)
+    )
+
+    de = easting - E0
+    de2 = de * de
+    lat = lat - de2 * (vii - de2 * (viii - de2 * ix))
+    lon = LON0 + de * (x - de2 * (xi - de2 * (xii - de2 * xiia)))
+    return lon, lat
+
+
+def osgb36_to_wgs84(lon, lat, m=math):
+    """Convert OSGB36 (lon, lat) in radians to WGS84 (lon, lat) in degrees"""
+    # to cartesian coordinates on the Airy ellipsoid
+    e2 = AIRY_E2
+    sin_lat = m.sin(lat)
+    cos_lat = m.cos(lat)
+    nu = AIRY_A / m.sqrt(1 - e2 * sin_lat * sin_lat)
+    x1 = nu * cos_lat * m.cos(lon)
+    y1 = nu * cos_lat * m.sin(lon)
+    z1 = (1 - e2) * nu * sin_lat
+
+    # Helmert transformation
+    s1 = S / 1e6 + 1
+    rx, ry, rz = (math.radians(r / 3600) for r in (RX, RY, RZ))
+    x2 = TX + x1 * s1 - y1 * rz + z1 * ry
+    y2 = TY + x1 * rz + y1 * s1 - z1 * rx
+    z2 = TZ - x1 * ry + y1 * rx + z1 * s1
+
+    # back to latitude and longitude on the WGS84 ellipsoid (Bowring's method)
+    atan2 = math.atan2 if m is math else m.arctan2
+    e2 = WGS84_E2
+    epsilon2 = e2 / (1 - e2)
+    p = m.sqrt(x2 * x2 + y2 * y2)
+    r = m.sqrt(p * p + z2 * z2)
+    beta = atan2(WGS84_B * z2 * (1 + epsilon2 * WGS84_B / r), WGS84_A * p)
+    lat = atan2(
+        z2 + epsilon2 * WGS84_B * m.sin(beta) ** 3,
+        p - e2 * WGS84_A * m.cos(beta) ** 3,
+    )
+    lon = atan2(y2, x2)
+    return m.degrees(lon), m.degrees(lat)
+
+
+def to_wgs84(coordinates) -> array:
+    """Convert an array of eastings and northings to one of WGS84 longitudes and
+    latitudes
+    """
+    if not coordinates:
+        return array("d")
+    if numpy is not None:
+        grid = numpy.frombuffer(coordinates, dtype="d")
+        lon, lat = osgb36_to_wgs84(
+            *grid_to_osgb36(grid[0::2], grid[1::2], numpy), numpy
+        )
+        result = numpy.empty(len(grid))
+        result[0::2] = lon
+        result[1::2] = lat
+        return array("d", result.tobytes())
+
+    result = array("d")
+    converted = {}  # the points where links join are often repeated
+    for point in zip(coordinates[::2], coordinates[1::2]):
+        lon_lat = converted.get(point)
+        if lon_lat is None:
+            lon_lat = converted[point] = osgb36_to_wgs84(*grid_to_osgb36(*point))
+        result.extend(lon_lat)
+    return result
+
+
+class WGS84Tracks:
+    """Converts the tracks of all the RouteLinks in a TransXChange document to
+    WGS84 in one go, the first time one is needed, and remembers them
+    """
+
+    def __init__(self, document):
+        self.route_sections = document.route_sections
+        self.tracks = None  # {route_link_id: coordinates}
+
+    def convert(self):
+        links = [
+            link
+            for section in self.route_sections.values()
+            for link in section.links
+            if link.srid == 27700
+        ]
+        grid = array("d")
+        for link in links:
+            grid += link.coordinates
+        converted = to_wgs84(grid)
+
+        self.tracks = {}
+        start = 0
+        for link in links:
+            end = start + len(link.coordinates)
+            self.tracks[link.id] = converted[start:end]
+            start = end
+
+    def get_coordinates(self, route_link) -> array:
+        """A RouteLink's coordinates as WGS84 longitudes and latitudes"""
+        if route_link.srid != 27700:
+            return route_link.coordinates
+        if self.tracks is None:
+            self.convert()
+        return self.tracks[route_link.id]
@@ -0,0 +1,57 @@
+"""Share Stops between many TransXChange documents, like all the documents in a
+regional bulk import, which mostly repeat the same NaPTAN stops.
+
+Pass the same StopRegistry to each TransXChange, as stop_registry. Then stops
+with the same ATCO code, name, indicator, locality and location are the same
+Stop object (so can be compared with "is"), and are only stored once.
+It's thread-safe, so can be shared by documents parsed in parallel by
+bulk.load() in threads (e.g. on a free-threaded build of Python).
+"""
+
+import sys
+import threading
+
+
+def intern(string):
+    if string is not None:
+        return sys.intern(string)
+
+
+class StopRegistry:
+    def __init__(self):
+        self.stops = {}  # {(atco_code, name, indicator, locality, location): Stop}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.stops)
+
+    def get_stop(self, stop):
+        """Get the shared Stop that's the same as stop, or make stop the shared
+        one (without its element, which would keep its document's tree alive)
+        """
+        location = stop.location
+        if location is not None:
+            location = (location.longitude, location.latitude, location.srid)
+        key = (
+            stop.atco_code,
+            stop.common_name,
+            stop.indicator,
+            stop.locality,
+            location,
+        )
+
+        shared = self.stops.get(key)
+        if shared is None:
+            with self.lock:
+                shared = self.stops.get(key)
+                if shared is None:
+                    stop.atco_code = intern(stop.atco_code)
+                    stop.common_name = intern(stop.common_name)
+                    stop.indicator = intern(stop.indicator)
+                    stop.locality = intern(stop.locality)
+                    if stop.location is not None:
+                        stop.location.longitude = intern(stop.location.longitude)
+                        stop.location.latitude = intern(stop.location.latitude)
+                    stop.element = None
+                    shared = self.stops[key] = stop
+        return shared
@@ -0,0 +1,132 @@
+"""Route shapes: each Route's stops in order and its RouteLinks' tracks joined
+into one line, worked out once per route and shared by all the journey
+patterns that use it.
+
+If some of the tracks to be joined are in British National Grid and some in
+WGS84, they're all converted to WGS84 (with projection.py) first.
+"""
+
+from array import array
+
+from . import geometry, projection
+
+
+def get_tracks(links, tracks) -> tuple:
+    """Get a list of the RouteLinks' coordinates, and their SRID - converted to
+    WGS84 with tracks (a projection.WGS84Tracks) if they're not all the same
+    """
+    srids = {link.srid for link in links if link.coordinates}
+    if len(srids) > 1:
+        return [tracks.get_coordinates(link) for link in links], None
+    return [link.coordinates for link in links], next(iter(srids), None)
+
+
+class RouteShape:
+    """stops is a list of ATCO codes in order. slices is a dict of RouteLink ids
+    to (start, end) indexes into coordinates
+    """
+
+    __slots__ = ("route_id", "stops", "coordinates", "srid", "slices")
+
+    def __init__(self, route, route_sections, tracks):
+        self.route_id = route.id
+        links = [
+            link
+            for ref in route.route_section_refs
+            if ref in route_sections
+            for link in route_sections[ref].links
+        ]
+
+        self.stops = []
+        for link in links:
+            if not self.stops or self.stops[-1] != link.from_stop:
+                self.stops.append(link.from_stop)
+            self.stops.append(link.to_stop)
+
+        coordinates, self.srid = get_tracks(links, tracks)
+        self.coordinates, offsets = geometry.merge_with_offsets(coordinates)
+        self.slices = {link.id: offset for link, offset in zip(links, offsets)}
+
+    def get_link_coordinates(self, route_link_id) -> array:
+        start, end = self.slices[route_link_id]
+        return self.coordinates[start:end]
+
+    def wkt(self) -> str:
+        return geometry.wkt(self.coordinates, self.srid)
+
+
+class RouteShapes:
+    """Builds RouteShapes for a TransXChange document, as they're needed"""
+
+    def __init__(self, document):
+        self.routes = document.routes
+        self.route_sections = document.route_sections
+        self.shapes = {}  # {route_id: RouteShape}
+        self.links = None  # {route_link_id: RouteLink}
+        self.tracks = projection.WGS84Tracks(document)
+        self.pattern_shapes = {}  # {(route_ref, route_link_refs): (coordinates, srid)}
+        # {id(JourneyPattern): (JourneyPattern, (coordinates, srid))}
+        self.journey_pattern_shapes = {}
+
+    def get_route_shape(self, route_id):
+        """Get a RouteShape, or None if there's no such Route"""
+        shape = self.shapes.get(route_id)
+        if shape is None and route_id in self.routes:
+            shape = self.shapes[route_id] = RouteShape(
+                self.routes[route_id], self.route_sections, self.tracks
+            )
+        return shape
+
+    def get_link(self, route_link_id):
+        if self.links is None:
+            self.links = {
+                link.id: link
+                for section in self.route_sections.values()
+                for link in section.links
+            }
+        return self.links.get(route_link_id)
+
+    def get_journey_pattern_shape(self, journey_pattern) -> tuple:
+        """Get the (coordinates, srid) of the part of a JourneyPattern's Route
+        between its first and last timing links' RouteLinks - or, if they aren't
+        all on the Route in order, the RouteLinks joined together
+        """
+        cached = self.journey_pattern_shapes.get(id(journey_pattern))
+        if cached is not None and cached[0] is journey_pattern:
+            return cached[1]
+
+        # journey patterns with the same route and links share a shape
+        refs = tuple(
+            link.route_link_ref
+            for link in journey_pattern.get_timinglinks()
+            if link.route_link_ref
+        )
+        key = (journey_pattern.route_ref, refs)
+        shape = self.pattern_shapes.get(key)
+        if shape is None:
+            shape = self.pattern_shapes[key] = self.build_pattern_shape(*key)
+        self.journey_pattern_shapes[id(journey_pattern)] = (journey_pattern, shape)
+        return shape
+
+    def build_pattern_shape(self, route_ref, refs) -> tuple:
+        route_shape = self.get_route_shape(route_ref)
+        if route_shape is not None:
+            if not refs:
+                return route_shape.coordinates, route_shape.srid
+            slices = [route_shape.slices.get(ref) for ref in refs]
+            if None not in slices and all(
+                previous[1] <= next_slice[1]
+                for previous, next_slice in zip(slices, slices[1:])
+            ):
+                start = slices[0][0]
+                end = slices[-1][1]
+                if start == 0 and end == len(route_shape.coordinates):
+                    return route_shape.coordinates, route_shape.srid
+                return route_shape.coordinates[start:end], route_shape.srid
+
+        links = [self.get_link(ref) for ref in refs]
+        links = [link for link in links if link is not None and link.coordinates]
+        if not links:
+            return array("d"), None
+        coordinates, srid = get_tracks(links, self.tracks)
+        return geometry.merge(coordinates), srid
@@ -0,0 +1,668 @@
+"""A compact binary format for parsed TransXChange documents, so that servers
+that only read timetables can load them without parsing any XML.
+
+dump() writes the stops, services, lines, journeys and operating profiles of
+some documents to a file. Strings are stored once, in a string table, and
+journeys' stop times are stored as integer seconds relative to the departure
+time, shared by all the journeys with the same ones.
+
+Only the attributes of the classes below are kept - for example, stops'
+locations, lines' brands and descriptions, journeys' private and ticket
+machine codes, vehicle types and garages, and stop usages' notes and timing
+statuses aren't.
+
+Snapshot() memory-maps a file, and only decodes the parts that are used - so
+opening even a national snapshot is quick, and only the pages of the services
+that are looked at are read from disk.
+
+A file starts with a header (the magic bytes, the format version and the byte
+order of the arrays) followed by the offset and length of each of SECTIONS.
+Each section is an array of integers, aligned to 8 bytes.
+"""
+
+import datetime
+import mmap
+import struct
+import sys
+from array import array
+
+from .columns import get_seconds
+from .txc import DayOfWeek
+
+MAGIC = b"TXCS"
+VERSION = 4
+
+HEADER = struct.Struct("<4sHB")  # magic, version, little endian (1) or not (0)
+SECTION = struct.Struct("<QQ")  # offset, length in bytes
+
+SECTIONS = (
+    ("string_offsets", "Q"),
+    ("strings", "B"),  # UTF-8
+    ("stop_rows", "i"),  # see STOP_FIELDS
+    ("profile_offsets", "I"),
+    ("profile_ints", "i"),  # see Writer.get_profile
+    ("pattern_offsets", "I"),
+    ("pattern_rows", "i"),  # see PATTERN_FIELDS
+    ("service_rows", "i"),  # see SERVICE_FIELDS
+    ("line_offsets", "I"),
+    ("line_rows", "i"),  # see LINE_FIELDS
+    ("journey_offsets", "I"),
+    ("journey_rows", "i"),  # see JOURNEY_FIELDS
+    ("note_offsets", "I"),
+    ("note_rows", "i"),  # (code, text) pairs
+)
+
+# columns of each row, mostly indexes into the string table (-1 meaning None)
+STOP_FIELDS = ("atco_code", "common_name", "indicator", "locality")
+PATTERN_FIELDS = ("stop", "arrival", "departure", "activity")
+SERVICE_FIELDS = (
+    "service_code",
+    "operator",
+    "description",
+    "origin",
+    "destination",
+    "start_date",  # date.toordinal(), or 0
+    "end_date",
+    "operating_profile",  # index, or -1
+)
+LINE_FIELDS = ("id", "line_name", "marketing_name", "colour", "font_colour")
+JOURNEY_FIELDS = (
+    "code",
+    "line_ref",
+    "pattern",
+    "departure_time",  # seconds
+    "operating_profile",
+    "operator",
+    "block_code",  # -2 if there's no Block
+    "block_description",
+    "notes",  # index, or -1
+)
+
+
+def get_ordinal(date) -> int:
+    return date.toordinal() if date else 0
+
+
+def get_date(ordinal):
+    return datetime.date.fromordinal(ordinal) if ordinal else None
+
+
+class Writer:
+    """Collects documents' data into arrays, sharing strings, stops, operating
+    profiles and stop times between them
+    """
+
+    def __init__(self):
+        self.strings = {}  # {string: index}
+        self.string_data = bytearray()
+        self.string_offsets = array("Q", (0,))
+
+        self.stops = {}  # {atco_code: index}
+        self.stop_rows = array("i")
+
+        self.profiles = {}  # {OperatingProfile.hash: index}
+        self.profile_offsets = array("I", (0,))
+        self.profile_ints = array("i")
+
+        self.patterns = {}  # {rows: index}
+        self.pattern_offsets = array("I", (0,))
+        self.pattern_rows = array("i")
+
+        self.service_rows = array("i")
+        self.line_offsets = array("I", (0,))
+        self.line_rows = array("i")
+        self.journey_offsets = array("I", (0,))
+        self.journey_rows = array("i")
+        self.notes = {}  # {notes items: index}
+        self.note_offsets = array("I", (0,))
+        self.note_rows = array("i")
+
+    def get_string(self, string) -> int:
+        if string is None:
+            return -1
+        index = self.strings.get(string)
+        if index is None:
+            index = self.strings[string] = len(self.strings)
+            self.string_data += string.encode()
+            self.string_offsets.append(len(self.string_data))
+        return index
+
+    def get_stop(self, stop) -> int:
+        index = self.stops.get(stop.atco_code)
+        if index is None:
+            index = self.stops[stop.atco_code] = len(self.stops)
+            self.stop_rows.extend(
+                self.get_string(getattr(stop, field)) for field in STOP_FIELDS
+            )
+        return index
+
+    def get_date_ranges(self, date_ranges, notes=False) -> list:
+        """(start, end) tuples, or (start, end, note, description) if notes"""
+        ints = [len(date_ranges)]
+        for start, end, *strings in date_ranges:
+            ints += (get_ordinal(start), get_ordinal(end))
+            if notes:
+                ints += map(self.get_string, strings)
+        return ints
+
+    def get_bank_holidays(self, bank_holidays) -> list:
+        """Bank holiday names as string indexes, and dates as negative ordinals"""
+        ints = [len(bank_holidays)]
+        for bank_holiday in bank_holidays:
+            if isinstance(bank_holiday, datetime.date):
+                ints.append(-bank_holiday.toordinal())
+            else:
+                ints.append(self.get_string(bank_holiday))
+        return ints
+
+    def get_profile(self, operating_profile) -> int:
+        """Encode an OperatingProfile's hash as a list of ints"""
+        if operating_profile is None:
+            return -1
+        index = self.profiles.get(operating_profile.hash)
+        if index is not None:
+            return index
+        (
+            regular_days,
+            periodic_days,
+            operation_days,
+            nonoperation_days,
+            serviced_organisations,
+            operation_bank_holidays,
+            nonoperation_bank_holidays,
+        ) = operating_profile.hash
+
+        ints = [len(regular_days), *regular_days]
+        if periodic_days is None:
+            ints.append(-1)
+        else:
+            ints.append(len(periodic_days))
+            for tag, text in periodic_days:
+                ints += (self.get_string(tag), self.get_string(text))
+        ints += self.get_date_ranges(operation_days, notes=True)
+        ints += self.get_date_ranges(nonoperation_days, notes=True)
+        ints.append(len(serviced_organisations))
+        for operation, working, serviced_organisation in serviced_organisations:
+            code, working_days, holidays = serviced_organisation
+            ints += (operation, working, self.get_string(code))
+            ints += self.get_date_ranges(working_days)
+            ints += self.get_date_ranges(holidays)
+        ints += self.get_bank_holidays(operation_bank_holidays)
+        ints += self.get_bank_holidays(nonoperation_bank_holidays)
+
+        index = self.profiles[operating_profile.hash] = len(self.profiles)
+        self.profile_ints.extend(ints)
+        self.profile_offsets.append(len(self.profile_ints))
+        return index
+
+    def get_notes(self, notes) -> int:
+        """Get the index of a journey's {code: text} notes"""
+        if not notes:
+            return -1
+        key = tuple(notes.items())
+        index = self.notes.get(key)
+        if index is None:
+            index = self.notes[key] = len(self.notes)
+            for code, text in key:
+                self.note_rows.extend((self.get_string(code), self.get_string(text)))
+            self.note_offsets.append(len(self.note_rows) // 2)
+        return index
+
+    def get_pattern(self, journey) -> int:
+        """Get the index of a journey's stop times (relative to its departure time)"""
+        departure_time = get_seconds(journey.departure_time)
+        rows = []
+        for cell in journey.get_times():
+            rows += (
+                self.get_stop(cell.stopusage.stop),
+                get_seconds(cell.arrival_time) - departure_time,
+                get_seconds(cell.departure_time) - departure_time,
+                self.get_string(cell.activity),
+            )
+        rows = tuple(rows)
+        index = self.patterns.get(rows)
+        if index is None:
+            index = self.patterns[rows] = len(self.patterns)
+            self.pattern_rows.extend(rows)
+            self.pattern_offsets.append(len(self.pattern_rows) // len(PATTERN_FIELDS))
+        return index
+
+    def add_document(self, document):
+        journeys = {}  # {service_code: [journeys]}
+        for journey in document.journeys:
+            journeys.setdefault(journey.service_ref, []).append(journey)
+
+        templates = {}  # {JourneyPattern id(): index}
+
+        for service in document.services.values():
+            self.service_rows.extend(
+                (
+                    self.get_string(service.service_code),
+                    self.get_string(service.operator),
+                    self.get_string(service.description),
+                    self.get_string(service.origin),
+                    self.get_string(service.destination),
+                    get_ordinal(service.operating_period.start),
+                    get_ordinal(service.operating_period.end),
+                    self.get_profile(service.operating_profile),
+                )
+            )
+
+            for line in service.lines:
+                self.line_rows.extend(
+                    self.get_string(getattr(line, field)) for field in LINE_FIELDS
+                )
+            self.line_offsets.append(len(self.line_rows) // len(LINE_FIELDS))
+
+            for journey in journeys.get(service.service_code, ()):
+                if (
+                    journey.timing_links
+                    or journey.start_deadrun is not None
+                    or journey.end_deadrun is not None
+                ):
+                    pattern = self.get_pattern(journey)
+                else:
+                    key = id(journey.journey_pattern)
+                    pattern = templates.get(key)
+                    if pattern is None:
+                        pattern = templates[key] = self.get_pattern(journey)
+                self.journey_rows.extend(
+                    (
+                        self.get_string(journey.code),
+                        self.get_string(journey.line_ref),
+                        pattern,
+                        get_seconds(journey.departure_time),
+                        self.get_profile(journey.operating_profile),
+                        self.get_string(journey.operator),
+                    )
+                )
+                if journey.block is None:
+                    self.journey_rows.extend((-2, -1))
+                else:
+                    self.journey_rows.extend(
+                        (
+                            self.get_string(journey.block.code),
+                            self.get_string(journey.block.description),
+                        )
+                    )
+                self.journey_rows.append(self.get_notes(journey.notes))
+            self.journey_offsets.append(len(self.journey_rows) // len(JOURNEY_FIELDS))
+
+    def write(self, open_file):
+        sections = [
+            (array("B", self.string_data) if name == "strings" else getattr(self, name))
+            for name, _ in SECTIONS
+        ]
+
+        offset = HEADER.size + SECTION.size * len(SECTIONS)
+        header = HEADER.pack(MAGIC, VERSION, sys.byteorder == "little")
+        for section in sections:
+            offset += -offset % 8
+            length = len(section) * section.itemsize
+            header += SECTION.pack(offset, length)
+            offset += length
+
+        open_file.write(header)
+        position = len(header)
+        for section in sections:
+            padding = -position % 8
+            open_file.write(bytes(padding))
+            section.tofile(open_file)
+            position += padding + len(section) * section.itemsize
+
+
+def dump(documents, open_file):
+    """Write TransXChange documents to a file opened in binary mode"""
+    writer = Writer()
+    for document in documents:
+        writer.add_document(document)
+    writer.write(open_file)
+
+
+class Stop:
+    __slots__ = STOP_FIELDS
+
+    def __init__(self, atco_code, common_name, indicator, locality):
+        self.atco_code = atco_code
+        self.common_name = common_name
+        self.indicator = indicator
+        self.locality = locality
+
+    def __str__(self):
+        name = self.common_name
+        if not name:
+            return self.atco_code
+        if self.indicator:
+            name = f"{name} ({self.indicator})"
+        if not self.locality or self.locality in name:
+            return name
+        return f"{self.locality} {name}"
+
+
+class DateRange:
+    __slots__ = ("start", "end", "note", "description")
+
+    def __init__(self, start, end, note="", description=""):
+        self.start = start
+        self.end = end
+        self.note = note
+        self.description = description
+
+    def __str__(self):
+        if self.start == self.end:
+            return str(self.start)
+        return f"{self.start} to {self.end}"
+
+
+class ServicedOrganisation:
+    def __init__(self, serviced_organisation_hash):
+        self.hash = serviced_organisation_hash
+        self.code, working_days, holidays = serviced_organisation_hash
+        self.working_days = [DateRange(*date_range) for date_range in working_days]
+        self.holidays = [DateRange(*date_range) for date_range in holidays]
+
+    def __str__(self):
+        return self.code
+
+
+class ServicedOrganisationDayType:
+    def __init__(self, operation, working, serviced_organisation):
+        self.operation = operation
+        self.working = working
+        self.serviced_organisation = serviced_organisation
+
+
+class OperatingProfile:
+    """Has the attributes of a txc.OperatingProfile that calendars.Calendars
+    uses, built from its hash
+    """
+
+    def __init__(self, operating_profile_hash):
+        (
+            regular_days,
+            periodic_days,
+            operation_days,
+            nonoperation_days,
+            serviced_organisations,
+            self.operation_bank_holiday_names,
+            self.nonoperation_bank_holiday_names,
+        ) = operating_profile_hash
+        self.regular_days = [DayOfWeek(day) for day in regular_days]
+        self.periodic_day_type = periodic_days is not None
+        self.weeks_of_month = tuple(
+            text for tag, text in periodic_days or () if tag == "WeekNumber" and text
+        )
+        self.week_of_month = self.weeks_of_month[0] if self.weeks_of_month else None
+        self.operation_days = [DateRange(*date_range) for date_range in operation_days]
+        self.nonoperation_days = [
+            DateRange(*date_range) for date_range in nonoperation_days
+        ]
+        self.serviced_organisations = [
+            ServicedOrganisationDayType(
+                operation, working, ServicedOrganisation(serviced_organisation)
+            )
+            for operation, working, serviced_organisation in serviced_organisations
+        ]
+        self.hash = operating_profile_hash
+
+
+class Line:
+    __slots__ = LINE_FIELDS
+
+    def __init__(self, id, line_name, marketing_name, colour, font_colour):
+        self.id = id
+        self.line_name = line_name
+        self.marketing_name = marketing_name
+        self.colour = colour
+        self.font_colour = font_colour
+
+
+class Block:
+    __slots__ = ("code", "description")
+
+    def __init__(self, code, description):
+        self.code = code
+        self.description = description
+
+
+class VehicleJourney:
+    __slots__ = (
+        "snapshot",
+        "code",
+        "service_ref",
+        "line_ref",
+        "pattern",
+        "departure_time",
+        "operating_profile",
+        "operator",
+        "block",
+        "notes",
+    )
+
+    def __init__(self, snapshot, service_ref, row):
+        self.snapshot = snapshot
+        self.service_ref = service_ref
+        (
+            code,
+            line_ref,
+            self.pattern,
+            departure_time,
+            operating_profile,
+            operator,
+            block_code,
+            block_description,
+            notes,
+        ) = row
+        self.code = snapshot.get_string(code)
+        self.line_ref = snapshot.get_string(line_ref)
+        self.departure_time = datetime.timedelta(seconds=departure_time)
+        self.operating_profile = snapshot.get_profile(operating_profile)
+        self.operator = snapshot.get_string(operator)
+        self.block = None
+        if block_code != -2:
+            self.block = Block(
+                snapshot.get_string(block_code), snapshot.get_string(block_description)
+            )
+        self.notes = snapshot.get_notes(notes)
+
+    def __str__(self):
+        return str(self.departure_time)
+
+    def get_stop_times(self) -> list:
+        """(Stop, arrival, departure, activity) tuples, with the times in seconds"""
+        snapshot = self.snapshot
+        departure_time = get_seconds(self.departure_time)
+        start = snapshot.pattern_offsets[self.pattern] * len(PATTERN_FIELDS)
+        end = snapshot.pattern_offsets[self.pattern + 1] * len(PATTERN_FIELDS)
+        rows = snapshot.pattern_rows[start:end].tolist()
+        return [
+            (
+                snapshot.get_stop(stop),
+                departure_time + arrival,
+                departure_time + departure,
+                snapshot.get_string(activity),
+            )
+            for stop, arrival, departure, activity in zip(*[iter(rows)] * 4)
+        ]
+
+
+class Service:
+    def __init__(self, snapshot, index):
+        row = snapshot.get_rows(snapshot.service_rows, index, len(SERVICE_FIELDS))
+        (
+            service_code,
+            operator,
+            description,
+            origin,
+            destination,
+            start_date,
+            end_date,
+            operating_profile,
+        ) = row
+        self.service_code = snapshot.get_string(service_code)
+        self.operator = snapshot.get_string(operator)
+        self.description = snapshot.get_string(description)
+        self.origin = snapshot.get_string(origin)
+        self.destination = snapshot.get_string(destination)
+        self.operating_period = DateRange(get_date(start_date), get_date(end_date))
+        self.operating_profile = snapshot.get_profile(operating_profile)
+
+        start, end = snapshot.line_offsets[index : index + 2]
+        width = len(LINE_FIELDS)
+        rows = snapshot.line_rows[start * width : end * width].tolist()
+        self.lines = [
+            Line(*map(snapshot.get_string, row)) for row in zip(*[iter(rows)] * width)
+        ]
+
+        start, end = snapshot.journey_offsets[index : index + 2]
+        self.journeys = [
+            VehicleJourney(
+                snapshot,
+                self.service_code,
+                snapshot.get_rows(snapshot.journey_rows, i, len(JOURNEY_FIELDS)),
+            )
+            for i in range(start, end)
+        ]
+
+
+class Snapshot:
+    """A memory-mapped snapshot file. services is a dict of service codes to
+    indexes, for get_service()
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as open_file:
+            header = open_file.read(HEADER.size)
+            if len(header) < HEADER.size or header[:4] != MAGIC:
+                raise ValueError(f"{path} is not a snapshot")
+            _, version, little_endian = HEADER.unpack(header)
+            if version != VERSION:
+                raise ValueError(f"{path} is version {version}, not {VERSION}")
+            if little_endian != (sys.byteorder == "little"):
+                raise ValueError(
+                    f"{path} was written on a machine with other byte order"
+                )
+            self.mmap = mmap.mmap(open_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buffer = memoryview(self.mmap)
+
+        for i, (name, typecode) in enumerate(SECTIONS):
+            offset, length = SECTION.unpack_from(
+                self.buffer, HEADER.size + SECTION.size * i
+            )
+            setattr(self, name, self.buffer[offset : offset + length].cast(typecode))
+
+        self.strings_cache = {-1: None}
+        self.stops = {}  # {index: Stop}
+        self.profiles = {-1: None}  # {index: OperatingProfile}
+
+        self.services = {}  # {service_code: [indexes]}
+        service_codes = self.service_rows[:: len(SERVICE_FIELDS)]
+        for index, service_code in enumerate(service_codes):
+            service_code = self.get_string(service_code)
+            self.services.setdefault(service_code, []).append(index)
+
+    def close(self):
+        for name, _ in SECTIONS:
+            getattr(self, name).release()
+        self.buffer.release()
+        self.mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_rows(self, rows, index, width) -> tuple:
+        return tuple(rows[index * width : (index + 1) * width])
+
+    def get_string(self, index):
+        string = self.strings_cache.get(index)
+        if string is None and index != -1:
+            start, end = self.string_offsets[index : index + 2]
+            string = self.strings_cache[index] = str(self.strings[start:end], "utf-8")
+        return string
+
+    def get_stop(self, index) -> Stop:
+        stop = self.stops.get(index)
+        if stop is None:
+            row = self.get_rows(self.stop_rows, index, len(STOP_FIELDS))
+            stop = self.stops[index] = Stop(*map(self.get_string, row))
+        return stop
+
+    def get_notes(self, index) -> dict:
+        """A journey's notes, as a new {code: text} dict"""
+        if index == -1:
+            return {}
+        start, end = self.note_offsets[index : index + 2]
+        strings = map(self.get_string, self.note_rows[start * 2 : end * 2].tolist())
+        return dict(zip(*[strings] * 2))
+
+    def get_date_ranges(self, ints, notes=False) -> tuple:
+        count = next(ints)
+        if notes:
+            return tuple(
+                (
+                    get_date(next(ints)),
+                    get_date(next(ints)),
+                    self.get_string(next(ints)),
+                    self.get_string(next(ints)),
+                )
+                for _ in range(count)
+            )
+        return tuple((get_date(next(ints)), get_date(next(ints))) for _ in range(count))
+
+    def get_bank_holidays(self, ints) -> tuple:
+        return tuple(
+            (datetime.date.fromordinal(-value) if value < 0 else self.get_string(value))
+            for value in [next(ints) for _ in range(next(ints))]
+        )
+
+    def get_profile(self, index):
+        if index in self.profiles:
+            return self.profiles[index]
+        start, end = self.profile_offsets[index : index + 2]
+        ints = iter(self.profile_ints[start:end].tolist())
+
+        regular_days = tuple(next(ints) for _ in range(next(ints)))
+        count = next(ints)
+        periodic_days = None
+        if count != -1:
+            periodic_days = tuple(
+                (self.get_string(next(ints)), self.get_string(next(ints)))
+                for _ in range(count)
+            )
+        operation_days = self.get_date_ranges(ints, notes=True)
+        nonoperation_days = self.get_date_ranges(ints, notes=True)
+        serviced_organisations = tuple(
+            (
+                bool(next(ints)),
+                bool(next(ints)),
+                (
+                    self.get_string(next(ints)),
+                    self.get_date_ranges(ints),
+                    self.get_date_ranges(ints),
+                ),
+            )
+            for _ in range(next(ints))
+        )
+        profile = self.profiles[index] = OperatingProfile(
+            (
+                regular_days,
+                periodic_days,
+                operation_days,
+                nonoperation_days,
+                serviced_organisations,
+                self.get_bank_holidays(ints),
+                self.get_bank_holidays(ints),
+            )
+        )
+        return profile
+
+    def get_service(self, index) -> Service:
+        return Service(self, index)
+
+    def get_services(self, service_code) -> list:
+        return [
+            self.get_service(index) for index in self.services.get(service_code, ())
+        ]
@@ -0,0 +1,215 @@
+"""Find the stops or route links (and so the services) in an area, or nearest a
+point, across many TransXChange documents without scanning them all.
+
+SpatialIndex is an R-tree packed with the Sort-Tile-Recursive algorithm: it's
+built in one go from all the items, and can't be changed after. Everything is
+indexed in WGS84 longitudes and latitudes (converting British National Grid
+coordinates with projection.py). Distances are in degrees of latitude, with
+longitudes scaled by the cosine of the latitude (an equirectangular
+approximation) - fine for finding things nearby, but not for measuring.
+"""
+
+import heapq
+import math
+from array import array
+
+from . import projection
+from .geometry import get_points
+
+
+def get_bbox(coordinates) -> tuple:
+    """(min_x, min_y, max_x, max_y) of an array of coordinates"""
+    xs = coordinates[::2]
+    ys = coordinates[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def get_union(bboxes) -> tuple:
+    min_xs, min_ys, max_xs, max_ys = zip(*bboxes)
+    return min(min_xs), min(min_ys), max(max_xs), max(max_ys)
+
+
+def get_distance(bbox, x, y, x_scale=1) -> float:
+    """Distance from a point to the nearest part of a bounding box, with
+    differences in x multiplied by x_scale
+    """
+    dx = max(bbox[0] - x, 0, x - bbox[2]) * x_scale
+    dy = max(bbox[1] - y, 0, y - bbox[3])
+    return math.hypot(dx, dy)
+
+
+class SpatialIndex:
+    """Bulk-load with (bbox, value) tuples, where bbox is
+    (min_x, min_y, max_x, max_y)
+    """
+
+    def __init__(self, items, node_size=16):
+        self.node_size = node_size
+        # each node is a (bbox, children) tuple, and the leaves' children are
+        # the (bbox, value) items
+        nodes = list(items)
+        self.count = len(nodes)
+        self.height = 0
+        self.root = None
+        if nodes:
+            while len(nodes) > node_size or not self.height:
+                nodes = self.pack(nodes)
+                self.height += 1
+            self.root = (get_union(node[0] for node in nodes), nodes)
+
+    def __len__(self):
+        return self.count
+
+    def pack(self, nodes) -> list:
+        """Group nodes into parent nodes of up to node_size, in vertical slices
+        sorted by x, then sorted by y within each slice
+        """
+        node_size = self.node_size
+        parent_count = math.ceil(len(nodes) / node_size)
+        slice_size = node_size * math.ceil(parent_count / math.ceil(parent_count**0.5))
+
+        nodes.sort(key=lambda node: node[0][0] + node[0][2])
+        parents = []
+        for i in range(0, len(nodes), slice_size):
+            vertical_slice = sorted(
+                nodes[i : i + slice_size], key=lambda node: node[0][1] + node[0][3]
+            )
+            for j in range(0, len(vertical_slice), node_size):
+                children = vertical_slice[j : j + node_size]
+                parents.append((get_union(child[0] for child in children), children))
+        return parents
+
+    def search(self, bbox) -> list:
+        """Values whose bounding boxes intersect bbox"""
+        min_x, min_y, max_x, max_y = bbox
+        results = []
+        if self.root is None:
+            return results
+        stack = [(self.root, self.height)]
+        while stack:
+            (_, children), level = stack.pop()
+            for child in children:
+                child_bbox = child[0]
+                if (
+                    child_bbox[0] <= max_x
+                    and child_bbox[1] <= max_y
+                    and child_bbox[2] >= min_x
+                    and child_bbox[3] >= min_y
+                ):
+                    if level:
+                        stack.append((child, level - 1))
+                    else:
+                        results.append(child[1])
+        return results
+
+    def nearest(self, x, y, count=1, max_distance=math.inf) -> list:
+        """Up to count (distance, value) tuples nearest to (x, y), nearest first.
+
+        x and y are a longitude and latitude - a degree of longitude is shorter
+        than a degree of latitude, by cos(latitude)
+        """
+        results = []
+        if self.root is None:
+            return results
+        x_scale = math.cos(math.radians(y))
+        # (distance, tiebreaker, level or -1 for an item, node or item)
+        queue = [(0, 0, self.height, self.root)]
+        tiebreaker = 1
+        while queue and len(results) < count:
+            distance, _, level, node = heapq.heappop(queue)
+            if distance > max_distance:
+                break
+            if level == -1:
+                results.append((distance, node[1]))
+                continue
+            for child in node[1]:
+                heapq.heappush(
+                    queue,
+                    (
+                        get_distance(child[0], x, y, x_scale),
+                        tiebreaker,
+                        level - 1,
+                        child,
+                    ),
+                )
+                tiebreaker += 1
+        return results
+
+
+def get_stop_index(documents) -> SpatialIndex:
+    """Index the Stops (with locations) in some documents. If a stop is in more
+    than one document, the first is used
+    """
+    stops = {}
+    for document in documents:
+        for atco_code, stop in document.stops.items():
+            if stop.location is not None and atco_code not in stops:
+                stops[atco_code] = stop
+
+    items = []
+    grid_stops = []
+    for stop in stops.values():
+        x = float(stop.location.longitude)
+        y = float(stop.location.latitude)
+        if stop.location.srid == 27700:
+            grid_stops.append((stop, x, y))
+        else:
+            items.append(((x, y, x, y), stop))
+
+    # convert all the British National Grid locations in one go
+    grid = array("d", [value for _, x, y in grid_stops for value in (x, y)])
+    for (stop, _, _), (x, y) in zip(grid_stops, get_points(projection.to_wgs84(grid))):
+        items.append(((x, y, x, y), stop))
+
+    return SpatialIndex(items)
+
+
+def get_route_link_index(documents) -> SpatialIndex:
+    """Index the RouteLinks (with tracks) in some documents. The values are
+    (RouteLink, service_codes) tuples, where service_codes is a frozenset of the
+    codes of the Services with JourneyPatterns on Routes that use the RouteLink
+    """
+    items = []
+    for document in documents:
+        route_services = {}  # {route_id: {service_code}}
+        for service in document.services.values():
+            for journey_pattern in service.journey_patterns.values():
+                if journey_pattern.route_ref:
+                    route_services.setdefault(journey_pattern.route_ref, set()).add(
+                        service.service_code
+                    )
+
+        link_services = {}  # {route_link_id: {service_code}}
+        for route_id, service_codes in route_services.items():
+            route = document.routes.get(route_id)
+            if route is None:
+                continue
+            for ref in route.route_section_refs:
+                section = document.route_sections.get(ref)
+                if section is not None:
+                    for link in section.links:
+                        link_services.setdefault(link.id, set()).update(service_codes)
+
+        tracks = projection.WGS84Tracks(document)
+        for section in document.route_sections.values():
+            for link in section.links:
+                if link.coordinates:
+                    items.append(
+                        (
+                            get_bbox(tracks.get_coordinates(link)),
+                            (link, frozenset(link_services.get(link.id, ()))),
+                        )
+                    )
+
+    return SpatialIndex(items)
+
+
+def get_services(route_link_index, bbox) -> set:
+    """Codes of the services whose route links pass through a bounding box (or,
+    strictly, whose route links' bounding boxes intersect it)
+    """
+    return {
+        service_code
+        for _, service_codes in route_link_index.search(bbox)
+        for service_code in service_codes
+    }
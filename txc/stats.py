@@ -0,0 +1,142 @@
+"""Instrumentation, for finding out where the time goes when parsing a document.
+
+    stats = ParseStats()
+    document = TransXChange("54.xml", stats=stats)
+    print(stats)
+
+Without stats, TransXChange doesn't do any of this, so it costs nothing.
+"""
+
+import os
+import time
+
+
+class SectionStats:
+    """How long a top level section (like StopPoints) took to read and parse,
+    and how big it was.
+
+    With stream_journeys, the VehicleJourneys time includes whatever was done
+    with each journey between iter_journeys() yielding them.
+    """
+
+    __slots__ = ("tag", "seconds", "elements", "objects", "bytes")
+
+    def __init__(self, tag, seconds, elements, objects, bytes):
+        self.tag = tag
+        self.seconds = seconds
+        self.elements = elements  # including all descendants
+        self.objects = objects  # like Stops, Services or VehicleJourneys
+        self.bytes = bytes  # read from the file (in 16 KiB chunks, so roughly)
+
+    def __repr__(self):
+        return (
+            f"<SectionStats {self.tag} {self.seconds:.3f}s {self.elements} elements "
+            f"{self.objects} objects {self.bytes} bytes>"
+        )
+
+
+class CountingReader:
+    """Wraps a file (or opens a path), counting the bytes read"""
+
+    def __init__(self, open_file):
+        if isinstance(open_file, (str, os.PathLike)):
+            self.file = open(open_file, "rb")
+            self.owned = True
+        else:
+            self.file = open_file
+            self.owned = False
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.file.read(size)
+        if isinstance(data, str):  # a file opened in text mode
+            self.bytes_read += len(data.encode(self.file.encoding or "utf-8"))
+        else:
+            self.bytes_read += len(data)
+        if not data:
+            self.close()
+        return data
+
+    def close(self):
+        """Close the file, if it was opened here"""
+        if self.owned:
+            self.file.close()
+
+
+class ParseStats:
+    """Pass to TransXChange as stats, and afterwards sections will be a dict of
+    tags to SectionStats, in document order.
+
+    callback is an optional function, called with each SectionStats as soon as
+    the section has been parsed.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.sections = {}
+        self.elements = 0
+        self.reader = None
+
+    def open(self, open_file) -> CountingReader:
+        self.reader = CountingReader(open_file)
+        self.last = (time.perf_counter(), 0, 0, 0)
+        return self.reader
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.close()
+
+    def count_elements(self, iterator):
+        for event, element in iterator:
+            if event == "end":
+                self.elements += 1
+            yield event, element
+
+    def add_section(self, tag, objects):
+        now = time.perf_counter()
+        last_time, last_elements, last_objects, last_bytes = self.last
+        bytes_read = self.reader.bytes_read
+        self.last = (now, self.elements, objects, bytes_read)
+
+        section = SectionStats(
+            tag,
+            now - last_time,
+            self.elements - last_elements,
+            objects - last_objects,
+            bytes_read - last_bytes,
+        )
+        if tag in self.sections:  # shouldn't happen, but just in case
+            previous = self.sections[tag]
+            section.seconds += previous.seconds
+            section.elements += previous.elements
+            section.objects += previous.objects
+            section.bytes += previous.bytes
+        self.sections[tag] = section
+        if self.callback is not None:
+            self.callback(section)
+
+    @property
+    def seconds(self) -> float:
+        return sum(section.seconds for section in self.sections.values())
+
+    @property
+    def bytes_read(self) -> int:
+        return self.reader.bytes_read if self.reader else 0
+
+    @property
+    def largest_section(self):
+        """The SectionStats with the most elements"""
+        return max(
+            self.sections.values(), key=lambda section: section.elements, default=None
+        )
+
+    def __str__(self):
+        lines = [
+            f"{'':<24} {'seconds':>9} {'elements':>10} {'objects':>9} {'bytes':>12}"
+        ]
+        for section in self.sections.values():
+            lines.append(
+                f"{section.tag:<24} {section.seconds:>9.3f} {section.elements:>10,} "
+                f"{section.objects:>9,} {section.bytes:>12,}"
+            )
+        return "\n".join(lines)
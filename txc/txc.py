@@ -1,7 +1,15 @@
 import calendar
+import collections
 import datetime
+import functools
 import logging
+import math
+import re
+import sys
 import xml.etree.ElementTree as ET
+from array import array
+
+from . import geometry
 
 logger = logging.getLogger(__name__)
 
@@ -9,44 +17,63 @@ logger = logging.getLogger(__name__)
 WEEKDAYS = {day: i for i, day in enumerate(calendar.day_name)}  # {'Monday:' 0,
 
 
-def parse_time(string: str) -> datetime.timedelta:
+DURATION_REGEX = re.compile(r"(-?)PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?")
+
+
+# Documents only have a few distinct times and durations, used many times over,
+# so the parsers remember their results
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_time_seconds(string: str) -> int:
+    """Parse a time like 07:15:00, returning the number of seconds since midnight"""
     hours, minutes, seconds = string.split(":", 3)
-    return datetime.timedelta(
-        hours=int(hours), minutes=int(minutes), seconds=int(seconds)
-    )
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
 
+@functools.lru_cache(maxsize=1024)
+def parse_duration_seconds(string: str) -> int:
+    """Parse an ISO 8601 duration like PT10M or PT1H30M, returning seconds"""
+    match = DURATION_REGEX.fullmatch(string.strip())
+    if match is None:
+        raise ValueError(f"Invalid duration: {string}")
+    sign, hours, minutes, seconds = match.groups()
+    seconds = int(hours or 0) * 3600 + int(minutes or 0) * 60 + int(seconds or 0)
+    if sign:
+        return -seconds
+    return seconds
 
+
+@functools.lru_cache(maxsize=4096)
+def parse_time(string: str) -> datetime.timedelta:
+    return datetime.timedelta(seconds=parse_time_seconds(string))
+
+
+@functools.lru_cache(maxsize=1024)
 def parse_duration(string: str) -> datetime.timedelta:
     """Parse an ISO 8601 duration like PT10M or PT1H30M."""
-    positive = 1
-    if string[0] == "-":
-        positive = -1
-        string = string[1:]
-    if string[:2] != "PT":
-        raise ValueError(f"Invalid duration: {string}")
-    string = string[2:]  # Remove PT prefix
-    hours = 0
-    minutes = 0
-    seconds = 0
-    current = ""
-    for char in string:
-        if char == "H":
-            hours = int(current)
-            current = ""
-        elif char == "M":
-            minutes = int(current)
-            current = ""
-        elif char == "S":
-            seconds = int(current)
-            current = ""
-        else:
-            current += char
-    return positive * datetime.timedelta(hours=hours, minutes=minutes, seconds=seconds)
+    return datetime.timedelta(seconds=parse_duration_seconds(string))
+
+
+def findtext_interned(element, path):
+    """Like element.findtext(path), but for strings that are repeated many times"""
+    text = element.findtext(path)
+    if text is not None:
+        return sys.intern(text)
 
 
 class Stop:
     """A TransXChange StopPoint."""
 
+    __slots__ = (
+        "atco_code",
+        "common_name",
+        "indicator",
+        "locality",
+        "location",
+        "element",
+    )
+
     def __init__(self, element):
         atco_code = element.findtext("StopPointRef")
         if not atco_code:
@@ -61,6 +88,11 @@ class Stop:
 
         self.locality = element.findtext("LocalityName")
 
+        location = element.find("Location")  # in an AnnotatedStopPointRef
+        if location is None:
+            location = element.find("Place/Location")  # in a StopPoint
+        self.location = get_point(location)
+
         self.element = element
 
     def __str__(self):
@@ -74,6 +106,67 @@ class Stop:
         return f"{self.locality} {name}"
 
 
+def get_point(location):
+    """Given a Location element, return a Point (or None, if it doesn't have
+    both coordinates)
+    """
+    if location is None:
+        return None
+    translation = location.find("Translation")
+    if translation is not None:
+        location = translation
+    point = Point(location)
+    if point.longitude and point.latitude:
+        return point
+
+
+def get_coordinates(locations) -> tuple:
+    """Given Location (or Translation) elements, return an array of coordinates
+    like [x0, y0, x1, y1, ...] and an SRID (27700 for British National Grid, or
+    None for WGS84 longitude and latitude). Locations without both, or with
+    coordinates that aren't finite numbers, are skipped.
+    """
+    coordinates = array("d")
+    if not locations or locations[0].find("Longitude") is not None:
+        x_tag, y_tag, srid = "Longitude", "Latitude", None
+    else:
+        x_tag, y_tag, srid = "Easting", "Northing", 27700
+    for location in locations:
+        x = location.findtext(x_tag)
+        y = location.findtext(y_tag)
+        if x and y:
+            try:
+                point = (float(x), float(y))
+            except ValueError:
+                point = None
+            if point is None or not all(map(math.isfinite, point)):
+                logger.warning("invalid coordinates %s %s", x, y)
+                continue
+            coordinates.extend(point)
+    return coordinates, srid if coordinates else None
+
+
+class Operator:
+    def __init__(self, element):
+        self.id = element.get("id")
+        self.national_operator_code = element.findtext("NationalOperatorCode")
+        self.operator_code = element.findtext("OperatorCode")
+        self.short_name = element.findtext("OperatorShortName")
+        self.name_on_licence = element.findtext("OperatorNameOnLicence")
+        self.trading_name = element.findtext("TradingName")
+        self.licence_number = element.findtext("LicenceNumber")
+
+    def __str__(self):
+        return self.trading_name or self.short_name or self.id
+
+
+class Garage:
+    def __init__(self, element):
+        self.code = element.findtext("GarageCode")
+        self.name = element.findtext("GarageName")
+        self.location = get_point(element.find("Location"))
+
+
 class Route:
     def __init__(self, element):
         self.id = element.get("id")
@@ -81,6 +174,21 @@ class Route:
             section.text for section in element.findall("RouteSectionRef")
         ]
 
+    def get_coordinates(self, route_sections: dict) -> tuple:
+        """Join the tracks of all the route's RouteLinks into one array of
+        coordinates, and return it with its SRID
+        """
+        links = [
+            link
+            for ref in self.route_section_refs
+            if ref in route_sections
+            for link in route_sections[ref].links
+            if link.coordinates
+        ]
+        if not links:
+            return array("d"), None
+        return geometry.merge(link.coordinates for link in links), links[0].srid
+
 
 class RouteSection:
     def __init__(self, element):
@@ -89,7 +197,7 @@ class RouteSection:
 
 
 class Point:
-    srid = None
+    __slots__ = ("longitude", "latitude", "srid")
 
     def __init__(self, element: ET.Element):
         lon = element.findtext("Longitude")
@@ -97,6 +205,7 @@ class Point:
             lat = element.findtext("Latitude")
             self.longitude = lon
             self.latitude = lat
+            self.srid = None
             return
 
         # British National Grid
@@ -104,6 +213,14 @@ class Point:
         self.latitude = element.findtext("Northing")
         self.srid = 27700
 
+    @classmethod
+    def from_coordinates(cls, x: float, y: float, srid=None):
+        point = cls.__new__(cls)
+        point.longitude = str(x)
+        point.latitude = str(y)
+        point.srid = srid
+        return point
+
     def wkt(self) -> str:
         wkt = f"POINT({self.longitude} {self.latitude})"
         if self.srid:
@@ -112,7 +229,7 @@ class Point:
 
 
 class RouteLink:
-    srid = None
+    __slots__ = ("id", "from_stop", "to_stop", "coordinates", "srid")
 
     def __init__(self, element):
         self.id = element.get("id")
@@ -121,24 +238,34 @@ class RouteLink:
         locations = element.findall("Track/Mapping/Location/Translation")
         if not locations:
             locations = element.findall("Track/Mapping/Location")
+        self.coordinates, self.srid = get_coordinates(locations)
 
-        self.track = [Point(location) for location in locations]
-
-        if self.track:
-            self.srid = self.track[0].srid
+    @property
+    def track(self) -> list:
+        """The coordinates as a list of Points (whose strings are the floats',
+        so may differ from the document's text - "51.90" becomes "51.9")
+        """
+        return [
+            Point.from_coordinates(x, y, self.srid)
+            for x, y in geometry.get_points(self.coordinates)
+        ]
 
     def wkt(self) -> str:
-        wkt = ", ".join(f"{point.longitude} {point.latitude}" for point in self.track)
-        wkt = f"LINESTRING({wkt})"
-        if self.srid:
-            wkt = f"SRID={self.srid};{wkt}"
-        return wkt
+        return geometry.wkt(self.coordinates, self.srid)
+
+    def wkb(self) -> bytes:
+        return geometry.wkb(self.coordinates, self.srid)
+
+    def geojson(self) -> dict:
+        return geometry.geojson(self.coordinates)
 
 
 class JourneyPattern:
     """A collection of JourneyPatternSections, in order."""
 
-    def __init__(self, element, sections, serviced_organisations):
+    def __init__(
+        self, element, sections, serviced_organisations, operating_profiles=None
+    ):
         self.id = element.attrib.get("id")
         self.sections = [
             sections[section_element.text]
@@ -151,26 +278,41 @@ class JourneyPattern:
 
         self.operating_profile = element.find("OperatingProfile")
         if self.operating_profile is not None:
-            self.operating_profile = OperatingProfile(
-                self.operating_profile, serviced_organisations
+            self.operating_profile = get_operating_profile(
+                self.operating_profile, serviced_organisations, operating_profiles
             )
 
         self.block = element.find("Operational/Block")
         if self.block is not None:
             self.block = Block(self.block)
 
+        self.template = None
+
     def get_timinglinks(self):
         for section in self.sections:
             yield from section.timinglinks
 
+    def get_template(self):
+        """Stop times relative to the departure time, compiled once and shared by
+        journeys without their own VehicleJourneyTimingLinks or dead runs.
+        """
+        if self.template is None:
+            self.template = list(
+                get_stop_times(
+                    ((link, None) for link in self.get_timinglinks()),
+                    datetime.timedelta(),
+                )
+            )
+        return self.template
+
 
 class JourneyPatternSection:
     """A collection of JourneyPatternStopUsages, in order."""
 
-    def __init__(self, element, stops):
+    def __init__(self, element, stops, missing_stops=None):
         self.id = element.get("id")
         self.timinglinks = [
-            JourneyPatternTimingLink(timinglink_element, stops)
+            JourneyPatternTimingLink(timinglink_element, stops, missing_stops)
             for timinglink_element in element
         ]
 
@@ -178,9 +320,23 @@ class JourneyPatternSection:
 class JourneyPatternStopUsage:
     """Either a 'From' or 'To' element in TransXChange."""
 
-    def __init__(self, element, stops):
-        self.activity = element.findtext("Activity")
-        self.dynamic_destination_display = element.findtext("DynamicDestinationDisplay")
+    __slots__ = (
+        "activity",
+        "dynamic_destination_display",
+        "sequencenumber",
+        "stop",
+        "timingstatus",
+        "wait_time",
+        "notes",
+        "row",
+        "parent",
+    )
+
+    def __init__(self, element, stops, missing_stops=None):
+        self.activity = findtext_interned(element, "Activity")
+        self.dynamic_destination_display = findtext_interned(
+            element, "DynamicDestinationDisplay"
+        )
 
         self.sequencenumber = element.get("SequenceNumber")
         if self.sequencenumber is not None:
@@ -190,9 +346,15 @@ class JourneyPatternStopUsage:
         try:
             self.stop = stops[stop_ref]
         except KeyError:
-            self.stop = Stop(element)
+            # not in StopPoints - share one Stop per ATCO code
+            if missing_stops is None:
+                self.stop = Stop(element)
+            else:
+                self.stop = missing_stops.get(stop_ref)
+                if self.stop is None:
+                    self.stop = missing_stops[stop_ref] = Stop(element)
 
-        self.timingstatus = element.findtext("TimingStatus")
+        self.timingstatus = findtext_interned(element, "TimingStatus")
 
         self.wait_time = element.find("WaitTime")
         if self.wait_time is not None:
@@ -218,9 +380,15 @@ class JourneyPatternStopUsage:
 
 
 class JourneyPatternTimingLink:
-    def __init__(self, element, stops):
-        self.origin = JourneyPatternStopUsage(element.find("From"), stops)
-        self.destination = JourneyPatternStopUsage(element.find("To"), stops)
+    __slots__ = ("origin", "destination", "runtime", "id", "route_link_ref")
+
+    def __init__(self, element, stops, missing_stops=None):
+        self.origin = JourneyPatternStopUsage(
+            element.find("From"), stops, missing_stops
+        )
+        self.destination = JourneyPatternStopUsage(
+            element.find("To"), stops, missing_stops
+        )
         self.origin.parent = self.destination.parent = self
         self.runtime = parse_duration(element.find("RunTime").text)
         self.id = element.get("id")
@@ -243,7 +411,102 @@ def get_deadrun_ref(deadrun_element):
         # ignore PositioningLinks
 
 
+def get_stop_times(timinglinks, departure_time, start_deadrun=None, end_deadrun=None):
+    """Given (JourneyPatternTimingLink, VehicleJourneyTimingLink or None) pairs,
+    yield (stopusage, arrival_time, departure_time, activity, notes) tuples.
+    """
+    stopusage = None
+    prev_activity = None
+    time = departure_time
+    deadrun = start_deadrun is not None
+    deadrun_next = False
+    wait_time = None
+    for timinglink, journey_timinglink in timinglinks:
+        if journey_timinglink and journey_timinglink.from_activity:
+            activity = journey_timinglink.from_activity
+        else:
+            activity = timinglink.origin.activity
+
+        if stopusage and prev_activity != activity:
+            # assume "pickUp" + "setDown" = "pickUpAndSetDown" = None
+            activity = None
+
+        # <From>
+        stopusage = timinglink.origin
+
+        if deadrun and start_deadrun == timinglink.id:
+            deadrun = False  # end of dead run
+
+        if not deadrun:
+            if wait_time is None:
+                wait_time = datetime.timedelta()
+            if journey_timinglink and journey_timinglink.from_wait_time is not None:
+                if journey_timinglink.from_wait_time != wait_time:
+                    wait_time += journey_timinglink.from_wait_time
+                # as per TxC PTI profile, WaitTime can be specified in both the To and From - belt and braces
+            elif stopusage.wait_time is not None:
+                if stopusage.wait_time != wait_time:
+                    wait_time += stopusage.wait_time
+                # ditto
+
+            notes = journey_timinglink and journey_timinglink.notes or stopusage.notes
+
+            if wait_time:
+                next_time = time + wait_time
+                yield stopusage, time, next_time, activity, notes
+                time = next_time
+            else:
+                yield stopusage, time, time, activity, notes
+
+            if journey_timinglink and journey_timinglink.run_time is not None:
+                run_time = journey_timinglink.run_time
+            else:
+                run_time = timinglink.runtime
+            if run_time:
+                time += run_time
+
+        if deadrun_next:
+            deadrun = True
+            deadrun_next = False
+        elif end_deadrun == timinglink.id:
+            deadrun_next = True  # start of dead run
+
+        # <To>
+        stopusage = timinglink.destination
+
+        if not deadrun:
+            if journey_timinglink and journey_timinglink.to_wait_time is not None:
+                wait_time = journey_timinglink.to_wait_time
+            else:
+                wait_time = stopusage.wait_time
+
+        if journey_timinglink and journey_timinglink.to_activity:
+            prev_activity = journey_timinglink.to_activity
+        else:
+            prev_activity = stopusage.activity
+
+    if not deadrun:
+        notes = None
+        if journey_timinglink and journey_timinglink.notes:
+            notes = journey_timinglink.notes
+        else:
+            notes = stopusage.notes
+
+        yield stopusage, time, time, prev_activity, notes
+
+
 class VehicleJourneyTimingLink:
+    __slots__ = (
+        "id",
+        "journeypatterntiminglinkref",
+        "run_time",
+        "from_wait_time",
+        "to_wait_time",
+        "from_activity",
+        "to_activity",
+        "notes",
+    )
+
     def __init__(self, element):
         self.id = element.attrib.get("id")
         self.journeypatterntiminglinkref = element.find(
@@ -261,8 +524,8 @@ class VehicleJourneyTimingLink:
         if self.to_wait_time is not None:
             self.to_wait_time = parse_duration(self.to_wait_time)
 
-        self.from_activity = element.findtext("From/Activity")
-        self.to_activity = element.findtext("To/Activity")
+        self.from_activity = findtext_interned(element, "From/Activity")
+        self.to_activity = findtext_interned(element, "To/Activity")
 
         self.notes = [
             (note_element.find("NoteCode").text, note_element.find("NoteText").text)
@@ -286,10 +549,36 @@ class Block:
 class VehicleJourney:
     """A scheduled journey that happens at most once per day"""
 
+    __slots__ = (
+        "code",
+        "private_code",
+        "ticket_machine_journey_code",
+        "ticket_machine_service_code",
+        "block",
+        "vehicle_type",
+        "garage_ref",
+        "service_ref",
+        "line_ref",
+        "journey_ref",
+        "journey_pattern",
+        "operating_profile",
+        "departure_time",
+        "start_deadrun",
+        "end_deadrun",
+        "operator",
+        "sequencenumber",
+        "timing_links",
+        "notes",
+        "frequency_interval",
+        "frequency_end_time",
+    )
+
     def __str__(self):
         return str(self.departure_time)
 
-    def __init__(self, element, services, serviced_organisations):
+    def __init__(
+        self, element, services, serviced_organisations, operating_profiles=None
+    ):
         self.code = element.find("VehicleJourneyCode").text
         self.private_code = element.findtext("PrivateCode")
 
@@ -326,8 +615,8 @@ class VehicleJourney:
 
         self.operating_profile = element.find("OperatingProfile")
         if self.operating_profile is not None:
-            self.operating_profile = OperatingProfile(
-                self.operating_profile, serviced_organisations
+            self.operating_profile = get_operating_profile(
+                self.operating_profile, serviced_organisations, operating_profiles
             )
 
         self.departure_time = parse_time(element.findtext("DepartureTime"))
@@ -374,86 +663,30 @@ class VehicleJourney:
             yield link, journey_links.get(link.id)
 
     def get_times(self):
-        stopusage = None
-        prev_activity = None
-        time = self.departure_time
-        deadrun = self.start_deadrun is not None
-        deadrun_next = False
-        wait_time = None
-        for timinglink, journey_timinglink in self.get_timinglinks():
-            if journey_timinglink and journey_timinglink.from_activity:
-                activity = journey_timinglink.from_activity
-            else:
-                activity = timinglink.origin.activity
-
-            if stopusage and prev_activity != activity:
-                # assume "pickUp" + "setDown" = "pickUpAndSetDown" = None
-                activity = None
-
-            # <From>
-            stopusage = timinglink.origin
-
-            if deadrun and self.start_deadrun == timinglink.id:
-                deadrun = False  # end of dead run
-
-            if not deadrun:
-                if wait_time is None:
-                    wait_time = datetime.timedelta()
-                if journey_timinglink and journey_timinglink.from_wait_time is not None:
-                    if journey_timinglink.from_wait_time != wait_time:
-                        wait_time += journey_timinglink.from_wait_time
-                    # as per TxC PTI profile, WaitTime can be specified in both the To and From - belt and braces
-                elif stopusage.wait_time is not None:
-                    if stopusage.wait_time != wait_time:
-                        wait_time += stopusage.wait_time
-                    # ditto
-
-                notes = (
-                    journey_timinglink and journey_timinglink.notes or stopusage.notes
-                )
-
-                if wait_time:
-                    next_time = time + wait_time
-                    yield Cell(stopusage, time, next_time, activity, notes)
-                    time = next_time
-                else:
-                    yield Cell(stopusage, time, time, activity, notes)
-
-                if journey_timinglink and journey_timinglink.run_time is not None:
-                    run_time = journey_timinglink.run_time
-                else:
-                    run_time = timinglink.runtime
-                if run_time:
-                    time += run_time
-
-            if deadrun_next:
-                deadrun = True
-                deadrun_next = False
-            elif self.end_deadrun == timinglink.id:
-                deadrun_next = True  # start of dead run
-
-            # <To>
-            stopusage = timinglink.destination
-
-            if not deadrun:
-                if journey_timinglink and journey_timinglink.to_wait_time is not None:
-                    wait_time = journey_timinglink.to_wait_time
-                else:
-                    wait_time = stopusage.wait_time
-
-            if journey_timinglink and journey_timinglink.to_activity:
-                prev_activity = journey_timinglink.to_activity
-            else:
-                prev_activity = stopusage.activity
+        if (
+            self.timing_links
+            or self.start_deadrun is not None
+            or self.end_deadrun is not None
+        ):
+            for row in get_stop_times(
+                self.get_timinglinks(),
+                self.departure_time,
+                self.start_deadrun,
+                self.end_deadrun,
+            ):
+                yield Cell(*row)
+            return
 
-        if not deadrun:
-            notes = None
-            if journey_timinglink and journey_timinglink.notes:
-                notes = journey_timinglink.notes
+        # most journeys only differ from their JourneyPattern in departure time
+        departure_time = self.departure_time
+        for row in self.journey_pattern.get_template():
+            stopusage, arrival, departure, activity, notes = row
+            arrival_time = departure_time + arrival
+            if departure is arrival:  # no wait time
+                yield Cell(stopusage, arrival_time, arrival_time, activity, notes)
             else:
-                notes = stopusage.notes
-
-            yield Cell(stopusage, time, time, prev_activity, notes)
+                departure = departure_time + departure
+                yield Cell(stopusage, arrival_time, departure, activity, notes)
 
 
 class ServicedOrganisation:
@@ -469,7 +702,13 @@ class ServicedOrganisation:
         holidays = element.findall("Holidays/DateRange")
         self.holidays = [DateRange(e) for e in holidays if len(e)]
 
-        self.hash = ET.tostring(element)
+        self.hash = (
+            self.code,
+            tuple(
+                (date_range.start, date_range.end) for date_range in self.working_days
+            ),
+            tuple((date_range.start, date_range.end) for date_range in self.holidays),
+        )
 
     def __str__(self):
         return self.name or self.code
@@ -502,6 +741,8 @@ class ServicedOrganisationDayType:
 
 
 class DayOfWeek:
+    __slots__ = ("day",)
+
     def __init__(self, day):
         if isinstance(day, int):
             self.day = day
@@ -517,6 +758,24 @@ class DayOfWeek:
         return calendar.day_name[self.day]
 
 
+def get_bank_holidays(element) -> tuple:
+    """Given a BankHolidayOperation/DaysOfOperation (or DaysOfNonOperation)
+    element, return a tuple of bank holiday names like "ChristmasDay",
+    and dates for any OtherPublicHolidays
+    """
+    if element is None:
+        return ()
+    bank_holidays = []
+    for child in element:
+        if child.tag == "OtherPublicHoliday":
+            date = child.findtext("Date")
+            if date:
+                bank_holidays.append(datetime.date.fromisoformat(date.strip()))
+        elif child.tag != "DaysOfWeek":
+            bank_holidays.append(child.tag)
+    return tuple(bank_holidays)
+
+
 class OperatingProfile:
     serviced_organisations = None
 
@@ -542,10 +801,23 @@ class OperatingProfile:
                     self.regular_days.append(DayOfWeek(day))
 
         self.week_of_month = None
+        self.weeks_of_month = ()
+        periodic_days = None  # for the fingerprint
         periodic_day_type = element.find("PeriodicDayType")
-        if periodic_day_type is not None:
-            logger.info(ET.tostring(periodic_day_type).decode())
-            self.week_of_month = periodic_day_type.findtext("WeekOfMonth/WeekNumber")
+        self.periodic_day_type = periodic_day_type is not None
+        if self.periodic_day_type:
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(ET.tostring(periodic_day_type).decode())
+            self.weeks_of_month = tuple(
+                week_number.text
+                for week_number in periodic_day_type.findall("WeekOfMonth/WeekNumber")
+                if week_number.text
+            )
+            if self.weeks_of_month:
+                self.week_of_month = self.weeks_of_month[0]
+            periodic_days = tuple(
+                (e.tag, (e.text or "").strip()) for e in periodic_day_type.iter()
+            )
         # Special Days:
 
         nonoperation_days = element.findall(
@@ -592,13 +864,61 @@ class OperatingProfile:
             if element.find("RegularDayType/HolidaysOnly") is not None:
                 self.operation_bank_holidays = element.find("RegularDayType")
 
-        self.hash = ET.tostring(element)
-        if serviced_organisations:
-            for organisation in serviced_organisations.values():
-                self.hash += organisation.hash
+        self.operation_bank_holiday_names = get_bank_holidays(
+            self.operation_bank_holidays
+        )
+        self.nonoperation_bank_holiday_names = get_bank_holidays(
+            self.nonoperation_bank_holidays
+        )
+
+        # a canonical fingerprint, for telling whether two profiles are the same
+        self.hash = (
+            tuple(day.day for day in self.regular_days),
+            periodic_days,
+            tuple(
+                (
+                    date_range.start,
+                    date_range.end,
+                    date_range.note,
+                    date_range.description,
+                )
+                for date_range in self.operation_days
+            ),
+            tuple(
+                (
+                    date_range.start,
+                    date_range.end,
+                    date_range.note,
+                    date_range.description,
+                )
+                for date_range in self.nonoperation_days
+            ),
+            tuple(
+                (
+                    day_type.operation,
+                    day_type.working,
+                    day_type.serviced_organisation.hash,
+                )
+                for day_type in self.serviced_organisations
+            ),
+            self.operation_bank_holiday_names,
+            self.nonoperation_bank_holiday_names,
+        )
+
+
+def get_operating_profile(element, serviced_organisations, operating_profiles=None):
+    """Parse an OperatingProfile element, but if an identical profile is already in
+    the operating_profiles dict, return that instead
+    """
+    operating_profile = OperatingProfile(element, serviced_organisations)
+    if operating_profiles is None:
+        return operating_profile
+    return operating_profiles.setdefault(operating_profile.hash, operating_profile)
 
 
 class DateRange:
+    __slots__ = ("start", "end", "note", "description")
+
     def __init__(self, element):
         self.start = element.findtext("StartDate")
         self.end = element.findtext("EndDate")
@@ -619,15 +939,21 @@ class DateRange:
 
 
 class Service:
-    def __init__(self, element, serviced_organisations, journey_pattern_sections):
+    def __init__(
+        self,
+        element,
+        serviced_organisations,
+        journey_pattern_sections,
+        operating_profiles=None,
+    ):
         self.mode = element.findtext("Mode", "")
 
         self.operator = element.findtext("RegisteredOperatorRef")
 
         self.operating_profile = element.find("OperatingProfile")
         if self.operating_profile is not None:
-            self.operating_profile = OperatingProfile(
-                self.operating_profile, serviced_organisations
+            self.operating_profile = get_operating_profile(
+                self.operating_profile, serviced_organisations, operating_profiles
             )
 
         self.operating_period = DateRange(element.find("OperatingPeriod"))
@@ -658,7 +984,10 @@ class Service:
             journey_pattern.id: journey_pattern
             for journey_pattern in (
                 JourneyPattern(
-                    journey_pattern, journey_pattern_sections, serviced_organisations
+                    journey_pattern,
+                    journey_pattern_sections,
+                    serviced_organisations,
+                    operating_profiles,
                 )
                 for journey_pattern in element.findall("StandardService/JourneyPattern")
             )
@@ -699,30 +1028,98 @@ class Line:
         self.marketing_name = element.findtext("MarketingName")
 
         self.colour = element.findtext("LineColour")
-        if element.findtext("LineFontColour") or element.findtext("LineImage"):
+        self.font_colour = element.findtext("LineFontColour")
+        self.image = element.find("LineImage") is not None
+        if (self.font_colour or self.image) and logger.isEnabledFor(logging.INFO):
             logger.info(ET.tostring(element).decode())
 
         self.outbound_description = element.findtext("OutboundDescription/Description")
         self.inbound_description = element.findtext("InboundDescription/Description")
 
 
+NAMESPACE = "{http://www.transxchange.org.uk/}"
+
+# top level elements, in the order the schema says they come in
+SECTION_ORDER = (
+    "ServicedOrganisations",
+    "NptgLocalities",
+    "StopPoints",
+    "StopAreas",
+    "RouteSections",
+    "Routes",
+    "JourneyPatternSections",
+    "Operators",
+    "Services",
+    "VehicleJourneys",
+    "Garages",
+)
+
+
+def read_events(pull_parser):
+    """Yield the events an XMLPullParser has so far, then (None, None) to say
+    it needs more data fed to it, forever
+    """
+    while True:
+        yield from pull_parser.read_events()
+        yield None, None
+
+
+# top level elements whose children are each parsed into an object
+SECTIONS = {
+    "ServicedOrganisations",
+    "StopPoints",
+    "RouteSections",
+    "Routes",
+    "JourneyPatternSections",
+    "Operators",
+    "VehicleJourneys",
+    "Garages",
+}
+
+
 class TransXChange:
     def get_journeys(self, service_code, line_id):
-        return [
-            journey
-            for journey in self.journeys
-            if journey.service_ref == service_code and journey.line_ref == line_id
-        ]
+        return list(self.journeys_by_line.get((service_code, line_id), ()))
 
-    def __get_journeys(self, journeys_element, serviced_organisations):
-        journeys = {
-            journey.code: journey
-            for journey in (
-                VehicleJourney(element, self.services, serviced_organisations)
-                for element in journeys_element
-            )
-        }
+    def get_diagnostics(self) -> collections.Counter:
+        """Count the things in the document that aren't fully supported, like
+        {"PeriodicDayType": 1, "LineImage": 2} - Counters for many documents can
+        be added together.
 
+        Operating profiles are only counted once per distinct profile.
+        """
+        diagnostics = collections.Counter()
+        for operating_profile in self.operating_profiles.values():
+            if operating_profile.periodic_day_type:
+                if operating_profile.week_of_month is None:
+                    diagnostics["PeriodicDayType"] += 1
+                else:
+                    diagnostics["WeekOfMonth"] += 1
+        for service in self.services.values():
+            for line in service.lines:
+                if line.font_colour:
+                    diagnostics["LineFontColour"] += 1
+                if line.image:
+                    diagnostics["LineImage"] += 1
+        for section in self.journey_pattern_sections.values():
+            for timinglink in section.timinglinks:
+                for stopusage in (timinglink.origin, timinglink.destination):
+                    if stopusage.notes:
+                        diagnostics["StopUsage Note"] += len(stopusage.notes)
+        for journey in self.journeys:
+            if journey.notes:
+                diagnostics["VehicleJourney Note"] += len(journey.notes)
+        return diagnostics
+
+    def get_lines(self):
+        """Yield (service, line, journeys) tuples for each Line with journeys"""
+        for service in self.services.values():
+            for line in service.lines:
+                journeys = self.journeys_by_line.get((service.service_code, line.id))
+                if journeys:
+                    yield service, line, journeys
+
+    def __get_journeys(self, journeys):
         # Some Journeys do not have a direct reference to a JourneyPattern,
         # but rather a reference to another Journey which has a reference to a JourneyPattern
         for journey in iter(journeys.values()):
@@ -733,82 +1130,341 @@ class TransXChange:
                 if journey.operating_profile is None:
                     journey.operating_profile = referenced_journey.operating_profile
 
-        return [journey for journey in journeys.values() if journey.journey_pattern]
+        journeys = [journey for journey in journeys.values() if journey.journey_pattern]
+
+        for journey in journeys:
+            key = (journey.service_ref, journey.line_ref)
+            if key in self.journeys_by_line:
+                self.journeys_by_line[key].append(journey)
+            else:
+                self.journeys_by_line[key] = [journey]
+
+        return journeys
+
+    def __parse_child(self, tag, element, stop_registry=None):
+        """Parse a child of a top level section, like a StopPoint in StopPoints"""
+        if tag == "StopPoints":
+            stop = Stop(element)
+            if stop_registry is not None:
+                stop = stop_registry.get_stop(stop)
+            elif self.low_memory:
+                stop.element = None
+            self.stops[stop.atco_code] = stop
+        elif tag == "RouteSections":
+            section = RouteSection(element)
+            self.route_sections[section.id] = section
+        elif tag == "Routes":
+            route = Route(element)
+            self.routes[route.id] = route
+        elif tag == "JourneyPatternSections":
+            section = JourneyPatternSection(element, self.stops, self.missing_stops)
+            if section.timinglinks:
+                self.journey_pattern_sections[section.id] = section
+        elif tag == "ServicedOrganisations":
+            organisation = ServicedOrganisation(element)
+            if self.serviced_organisations is None:
+                self.serviced_organisations = {}
+            self.serviced_organisations[organisation.code] = organisation
+        elif tag == "Operators":
+            self.operators.append(Operator(element))
+        elif tag == "VehicleJourneys":
+            journey = VehicleJourney(
+                element,
+                self.services,
+                self.serviced_organisations,
+                self.operating_profiles,
+            )
+            self.__journeys[journey.code] = journey
+        elif tag == "Garages":
+            if self.low_memory:
+                garage = Garage(element)
+                self.garages[garage.code] = garage
+            else:
+                self.garages[element.findtext("GarageCode")] = element
 
-    def __init__(self, open_file):
-        iterator = ET.iterparse(open_file)
+    def __stream_journey(self, element, journey_refs, deferred):
+        """Parse a VehicleJourney, and yield it (and any journeys that were waiting
+        for it, because of a VehicleJourneyRef) unless it lacks a JourneyPattern
+        """
+        journey = VehicleJourney(
+            element,
+            self.services,
+            self.serviced_organisations,
+            self.operating_profiles,
+        )
+        if journey.journey_ref and journey.journey_ref not in journey_refs:
+            if journey.journey_pattern is None or journey.operating_profile is None:
+                deferred.setdefault(journey.journey_ref, []).append(journey)
+                return
+
+        journeys = [journey]
+        for journey in journeys:
+            referenced = journey_refs.get(journey.journey_ref)
+            if referenced is not None:
+                if journey.journey_pattern is None:
+                    journey.journey_pattern = referenced[0]
+                if journey.operating_profile is None:
+                    journey.operating_profile = referenced[1]
+            # (just what referring journeys need, not the whole journey)
+            journey_refs[journey.code] = (
+                journey.journey_pattern,
+                journey.operating_profile,
+            )
+            journeys.extend(deferred.pop(journey.code, ()))
+            if journey.journey_pattern:
+                yield journey
+
+    def iter_journeys(self):
+        """If the document was opened with stream_journeys=True, parse the rest of
+        it, yielding each VehicleJourney as soon as its element ends
+        """
+        parser = self.__parser
+        self.__parser = None
+        if parser is not None:
+            yield from parser
+
+    def __init__(
+        self,
+        open_file,
+        low_memory=False,
+        sections=None,
+        stream_journeys=False,
+        stats=None,
+        stop_registry=None,
+    ):
+        """If low_memory is True, each element is discarded as soon as it's been
+        parsed, and operators and garages are Operator and Garage objects
+        rather than elements. OperatingProfiles' operation_bank_holidays and
+        nonoperation_bank_holidays elements are None - use
+        operation_bank_holiday_names and nonoperation_bank_holiday_names.
+
+        sections is an optional collection of the top level elements to parse,
+        like {"Services"} or {"StopPoints", "RouteSections", "Routes"} -
+        others are skipped over, and parsing stops after the last one (assuming
+        they're in the order the schema says). Services need
+        JourneyPatternSections for their journey patterns, and VehicleJourneys
+        need Services.
+
+        If stream_journeys is True, parsing pauses at the start of the
+        VehicleJourneys, and journeys is left empty - use iter_journeys() to
+        get the journeys one at a time (and parse the Garages after them).
+
+        stats is an optional stats.ParseStats, to record how long each top level
+        section takes to parse, and how big it is.
+
+        open_file can also be an ET.XMLPullParser (with "start" and "end"
+        events) that's being fed data elsewhere, like in aio.py - then parsing
+        pauses whenever it needs more data, and continues in iter_journeys().
+
+        stop_registry is an optional registry.StopRegistry, to share identical
+        Stops (in StopPoints) with other documents.
+        """
+        self.low_memory = low_memory
+        if sections is not None:
+            sections = frozenset(sections)
+            unknown = sections - SECTIONS - {"Services"}
+            if unknown:
+                raise ValueError(f"Unknown sections: {', '.join(sorted(unknown))}")
+        if low_memory:
+            self.operators = []
 
         self.services = {}
         self.stops = {}
+        # referenced in JourneyPatternSections but not StopPoints:
+        self.missing_stops = {}
         self.routes = {}
         self.route_sections = {}
         self.journeys = []
+        self.journeys_by_line = {}  # {(service_code, line_id): [journeys]}
         self.garages = {}
+        self.operating_profiles = {}  # {OperatingProfile.hash: OperatingProfile}
 
-        serviced_organisations = None
-
-        journey_pattern_sections = {}
-
-        for _, element in iterator:
-            if element.tag[:33] == "{http://www.transxchange.org.uk/}":
-                element.tag = element.tag[33:]
-            tag = element.tag
-
-            if tag == "StopPoints":
-                for stop_element in element:
-                    stop = Stop(stop_element)
-                    self.stops[stop.atco_code] = stop
-                element.clear()
-            elif tag == "RouteSections":
-                for section_element in element:
-                    section = RouteSection(section_element)
-                    self.route_sections[section.id] = section
-                element.clear()
-            elif tag == "Routes":
-                for route_element in element:
-                    route = Route(route_element)
-                    self.routes[route.id] = route
-                element.clear()
-            elif tag == "Operators":
-                self.operators = element
-            elif tag == "JourneyPatternSections":
-                for section in element:
-                    section = JourneyPatternSection(section, self.stops)
-                    if section.timinglinks:
-                        journey_pattern_sections[section.id] = section
-                element.clear()
-            elif tag == "ServicedOrganisations":
-                serviced_organisations = (
-                    ServicedOrganisation(child) for child in element
-                )
-                serviced_organisations = {
-                    organisation.code: organisation
-                    for organisation in serviced_organisations
-                }
-            elif tag == "VehicleJourneys":
-                try:
-                    self.journeys = self.__get_journeys(element, serviced_organisations)
-                except (AttributeError, KeyError) as e:
-                    logger.exception(e)
-                    return
-                element.clear()
-            elif tag == "Service":
-                service = Service(
-                    element, serviced_organisations, journey_pattern_sections
-                )
-                self.services[service.service_code] = service
-            elif tag == "Garages":
-                for garage_element in element:
-                    self.garages[garage_element.findtext("GarageCode")] = garage_element
-                element.clear()
+        self.serviced_organisations = None
+        self.journey_pattern_sections = {}
+        self.__journeys = {}  # {code: VehicleJourney}, before filtering
+
+        self.__parser = None
+        parser = self.__parse(
+            open_file, sections, stream_journeys, stats, stop_registry
+        )
+        for _ in parser:
+            # paused at the start of the VehicleJourneys
+            self.__parser = parser
+            break
+
+    def __count_objects(self) -> int:
+        """How many objects have been parsed so far, for ParseStats"""
+        return sum(
+            len(objects)
+            for objects in (
+                self.serviced_organisations or (),
+                self.stops,
+                self.missing_stops,
+                self.route_sections,
+                self.routes,
+                self.journey_pattern_sections,
+                self.operators if self.low_memory else (),
+                self.services,
+                self.operating_profiles,
+                self.journeys,
+                self.garages,
+            )
+        )
 
-        self.attributes = element.attrib
+    def __parse(self, open_file, sections, stream_journeys, stats, stop_registry):
+        low_memory = self.low_memory
+        if sections is not None:
+            last_section = max(sections, key=SECTION_ORDER.index, default=None)
+        pull = isinstance(open_file, ET.XMLPullParser)
+        if stats is not None:
+            if pull:
+                raise ValueError("Can't record stats with an XMLPullParser")
+            open_file = stats.open(open_file)
+        streaming = pull or low_memory or sections is not None or stream_journeys
+        if pull:
+            iterator = read_events(open_file)
+            parents = []
+        elif streaming:
+            iterator = ET.iterparse(open_file, ("start", "end"))
+            parents = []
+        else:
+            iterator = ET.iterparse(open_file)
+        if stats is not None:
+            iterator = stats.count_elements(iterator)
+
+        try:
+            journey_refs = {}  # {code: (JourneyPattern, OperatingProfile)}
+            deferred = {}  # {journey_ref: [VehicleJourneys]}
+
+            for event, element in iterator:
+                if event is None:
+                    yield  # wait for more data
+                    continue
+                if element.tag[:33] == NAMESPACE:
+                    element.tag = element.tag[33:]
+                tag = element.tag
+
+                if streaming:
+                    if event == "start":
+                        if not parents:
+                            self.attributes = element.attrib
+                        elif (
+                            stream_journeys
+                            and tag == "VehicleJourneys"
+                            and len(parents) == 1
+                            and (sections is None or tag in sections)
+                        ):
+                            yield  # carry on in iter_journeys()
+                        parents.append(element)
+                        continue
+                    parents.pop()
+
+                    # parse (or skip) each child of a section as soon as it ends
+                    if len(parents) == 2:
+                        section = parents[1].tag
+                        if sections is not None and section not in sections:
+                            parents[1].remove(element)
+                            continue
+                        if section in SECTIONS and (
+                            low_memory or section != "Operators"
+                        ):
+                            try:
+                                if stream_journeys and section == "VehicleJourneys":
+                                    yield from self.__stream_journey(
+                                        element, journey_refs, deferred
+                                    )
+                                else:
+                                    self.__parse_child(section, element, stop_registry)
+                            except (AttributeError, KeyError) as e:
+                                if section != "VehicleJourneys":
+                                    raise
+                                logger.exception(e)
+                                return
+                            parents[1].remove(element)
+                            continue
+
+                if tag in SECTIONS and (sections is None or tag in sections):
+                    if tag == "Operators" and not low_memory:
+                        self.operators = element
+                    else:
+                        try:
+                            for child in element:
+                                self.__parse_child(tag, child, stop_registry)
+                            if tag == "VehicleJourneys":
+                                self.journeys = self.__get_journeys(self.__journeys)
+                                self.__journeys = {}
+                                for journey_ref in deferred:
+                                    logger.warning(
+                                        "VehicleJourneyRef %s not found", journey_ref
+                                    )
+                        except (AttributeError, KeyError) as e:
+                            if tag != "VehicleJourneys":
+                                raise
+                            logger.exception(e)
+                            return
+                        element.clear()
+                        if tag == "JourneyPatternSections" and low_memory:
+                            for stop in self.missing_stops.values():
+                                stop.element = None
+                elif tag == "Service":
+                    service = Service(
+                        element,
+                        self.serviced_organisations,
+                        self.journey_pattern_sections,
+                        self.operating_profiles,
+                    )
+                    self.services[service.service_code] = service
+                    element.clear()
+                    if streaming:
+                        parents[-1].remove(element)
+
+                # detach each top level section from the root TransXChange element
+                if streaming and len(parents) == 1:
+                    parents[0].remove(element)
+                    if low_memory and tag in ("Services", "VehicleJourneys"):
+                        # redundant with the bank holiday names
+                        for operating_profile in self.operating_profiles.values():
+                            operating_profile.operation_bank_holidays = None
+                            operating_profile.nonoperation_bank_holidays = None
+                    if stats is not None:
+                        stats.add_section(
+                            tag, self.__count_objects() + len(journey_refs)
+                        )
+                    if sections is not None and tag == last_section:
+                        break
+                elif stats is not None and not streaming and tag in SECTION_ORDER:
+                    stats.add_section(tag, self.__count_objects())
+
+            if not streaming:
+                self.attributes = element.attrib
+        finally:
+            if stats is not None:
+                stats.close()  # even if parsing stopped early, or failed
+
+
+def scan(open_file) -> TransXChange:
+    """Quickly read just the root element's attributes (like RevisionNumber),
+    Operators and Services (with their Lines and OperatingPeriods), stopping
+    before the VehicleJourneys
+    """
+    return TransXChange(
+        open_file, sections=("ServicedOrganisations", "Operators", "Services")
+    )
 
 
 class Cell:
-    last = False
+    __slots__ = (
+        "stopusage",
+        "arrival_time",
+        "departure_time",
+        "wait_time",
+        "activity",
+        "notes",
+        "last",
+    )
 
     def __init__(self, stopusage, arrival_time, departure_time, activity, notes):
+        self.last = False
         self.stopusage = stopusage
         self.arrival_time = arrival_time
         self.departure_time = departure_time